@@ -1,55 +1,42 @@
-import sqlite3
-import os
-from datetime import datetime, timedelta
-
-
-def backup_database(DB_PATH, BACKUP_DIR):
-    """Backs up the SQLite database."""
+from dotenv import load_dotenv
 
-    # Create filepath for upcoming backup
-    datestamp = datetime.now().strftime("%Y-%m-%d")
-    backup_db_path = os.path.join(BACKUP_DIR, f"funtimes_{datestamp}.db")
-
-    # Remove backups older than 7 days old
-    one_week_ago = datetime.now() - timedelta(7)
+import argparse
+import logging
+import os
+import sqlite3
 
-    for filename in os.listdir(BACKUP_DIR):
-        if filename.startswith("funtimes_"):
+from utils.backup_verification import log_verification, verify_backup
+from utils.database_backup import backup_database, logger
 
-            try:
-                # Extract date from filename
-                backup_date_str = filename[:-3].split("_")[1]
-                backup_date = datetime.strptime(backup_date_str, "%Y-%m-%d")
 
-                if backup_date < one_week_ago:
-                    backup_path = os.path.join(BACKUP_DIR, filename)
-                    os.remove(backup_path)
-                    print(f"Removed old backup: {backup_path}")
+load_dotenv()
 
-            except ValueError:
-                print(f"Skipping file with invalid date format: {filename}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Back up the SQLite database into a gzip compressed file, the same way the bot does."
+    )
+    parser.add_argument("--db", default=os.path.join("..", "storage", "funtimes.db"))
+    parser.add_argument(
+        "--backup-dir", default=os.path.join("..", "storage", "backups")
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=int(os.getenv("BACKUP_RETENTION_DAYS", "14")),
+        help="Defaults to BACKUP_RETENTION_DAYS, like the bot",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.backup_dir, exist_ok=True)
+
+    # Show the backup logs in the terminal
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
 
-    # Backup DB
     try:
-        db = sqlite3.connect(DB_PATH)
-
-        # Use the backup API to create a consistent copy
-        backup_conn = sqlite3.connect(backup_db_path)
-        with backup_conn:
-            db.backup(backup_conn)
-
-        db.close()
-        backup_conn.close()
-
-        print(f"Database backed up successfully to: {backup_db_path}")
+        # The changelog is left for the bot's next incremental backup. Replaying rows this backup already holds is harmless
+        report = backup_database(args.db, args.backup_dir, args.retention_days)
+        log_verification(verify_backup(report.path))
 
     except sqlite3.Error as e:
         print(f"Error backing up database: {e}")
-
-
-if __name__ == "__main__":
-    DB_PATH = os.path.join("..", "storage", "funtimes.db")
-    BACKUP_DIR = os.path.join("..", "storage", "backups")
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-
-    backup_database(DB_PATH, BACKUP_DIR)
@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from utils.database import Database
+from utils.leaderboard_engine import LeaderboardEngine
+from utils.level_store import LevelStore, MemoryLevelStore, SQLiteLevelStore
+from utils.migrations import migrate
+
+GUILD_ID = 1000
+OTHER_GUILD_ID = 2000
+
+
+def make_row(user_id: int, guild_id: int, experience: int, level: int = 1) -> dict:
+    """Return a level row with a distinct message timestamp per user."""
+
+    return {
+        "user_id": user_id,
+        "guild_id": guild_id,
+        "experience": experience,
+        "level": level,
+        "previous_message_timestamp": float(user_id),
+    }
+
+
+async def open_sqlite(db_dir: str) -> Database:
+    """Create a database with an empty, fully migrated level table in a directory."""
+
+    db = Database(os.path.join(db_dir, "level_store.db"))
+    await db.connect()
+    await migrate(db)
+
+    return db
+
+
+class Backend:
+    """A level store implementation together with what it needs to be created & cleaned up."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.db = None
+        self.db_dir = None
+
+    async def open(self) -> LevelStore:
+        if self.name == "memory":
+            return MemoryLevelStore()
+
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.db = await open_sqlite(self.db_dir.name)
+
+        if self.name == "sqlite+engine":
+            return SQLiteLevelStore(self.db, LeaderboardEngine())
+
+        return SQLiteLevelStore(self.db)
+
+    def close(self) -> None:
+        if self.db:
+            self.db.close()
+            self.db_dir.cleanup()
+            self.db = None
+
+
+# Conformance checks every backend has to pass
+
+
+async def check_get_missing(store: LevelStore) -> None:
+    assert await store.get(1, GUILD_ID) is None
+    assert await store.rank_of(GUILD_ID, 1) is None
+    assert await store.guild_size(GUILD_ID) == 0
+    assert await store.top(GUILD_ID, 5) == []
+
+
+async def check_upsert_and_get(store: LevelStore) -> None:
+    await store.upsert(make_row(1, GUILD_ID, 50, 2))
+    assert await store.get(1, GUILD_ID) == make_row(1, GUILD_ID, 50, 2)
+
+    await store.upsert(make_row(1, GUILD_ID, 80, 3))
+    await store.flush()
+    assert await store.get(1, GUILD_ID) == make_row(1, GUILD_ID, 80, 3)
+    assert await store.guild_size(GUILD_ID) == 1
+
+
+async def check_ranking_order(store: LevelStore) -> None:
+    # Ties on experience are broken by the lower user ID
+    await store.upsert_many(
+        [
+            make_row(5, GUILD_ID, 100),
+            make_row(3, GUILD_ID, 300),
+            make_row(4, GUILD_ID, 100),
+            make_row(1, GUILD_ID, 0),
+            make_row(2, OTHER_GUILD_ID, 999),
+        ]
+    )
+
+    expected = [(3, 300, 1), (4, 100, 1), (5, 100, 1), (1, 0, 1)]
+
+    assert [tuple(row) for row in await store.top(GUILD_ID, 10)] == expected
+    assert [tuple(row) for row in await store.top(GUILD_ID, 2)] == expected[:2]
+    assert await store.guild_size(GUILD_ID) == 4
+    assert await store.guild_size(OTHER_GUILD_ID) == 1
+
+    for position, (user_id, _, _) in enumerate(expected, start=1):
+        assert await store.rank_of(GUILD_ID, user_id) == position
+        assert tuple(await store.at(GUILD_ID, position)) == expected[position - 1]
+
+    assert await store.at(GUILD_ID, 0) is None
+    assert await store.at(GUILD_ID, len(expected) + 1) is None
+    assert await store.rank_of(GUILD_ID, 2) is None
+
+
+async def check_rank_moves(store: LevelStore) -> None:
+    await store.upsert_many(
+        [make_row(user_id, GUILD_ID, user_id * 10) for user_id in range(1, 11)]
+    )
+    assert await store.rank_of(GUILD_ID, 1) == 10
+
+    await store.upsert(make_row(1, GUILD_ID, 1000))
+    assert await store.rank_of(GUILD_ID, 1) == 1
+    assert await store.rank_of(GUILD_ID, 10) == 2
+    assert await store.guild_size(GUILD_ID) == 10
+
+
+CHECKS: List[Callable[[LevelStore], Awaitable[None]]] = [
+    check_get_missing,
+    check_upsert_and_get,
+    check_ranking_order,
+    check_rank_moves,
+]
+
+
+async def run_checks(backend: Backend) -> int:
+    """Run every conformance check on a fresh store and return how many failed."""
+
+    failures = 0
+
+    for check in CHECKS:
+        store = await backend.open()
+
+        try:
+            await check(store)
+            print(f"  PASS {check.__name__}")
+
+        except AssertionError:
+            failures += 1
+            print(f"  FAIL {check.__name__}")
+
+        finally:
+            backend.close()
+
+    return failures
+
+
+async def time_operation(
+    operation: Callable[[], Awaitable[object]], iterations: int
+) -> float:
+    """Return how many times per second an operation can run."""
+
+    start_time = time.perf_counter()
+
+    for _ in range(iterations):
+        await operation()
+
+    return iterations / (time.perf_counter() - start_time)
+
+
+async def run_benchmark(
+    backend: Backend, guilds: int, members: int, iterations: int
+) -> Dict[str, float]:
+    """Fill a store and return the operations per second of every query."""
+
+    store = await backend.open()
+    rng = random.Random(0)
+    results = {}
+
+    rows = [
+        make_row(user_id, guild_id, rng.randint(0, 500000))
+        for guild_id in range(1, guilds + 1)
+        for user_id in range(1, members + 1)
+    ]
+
+    try:
+        start_time = time.perf_counter()
+
+        for i in range(0, len(rows), 500):
+            await store.upsert_many(rows[i : i + 500])
+
+        await store.flush()
+        results["upsert_many"] = len(rows) / (time.perf_counter() - start_time)
+
+        def random_member() -> Tuple[int, int]:
+            return rng.randint(1, guilds), rng.randint(1, members)
+
+        async def get() -> None:
+            guild_id, user_id = random_member()
+            await store.get(user_id, guild_id)
+
+        async def upsert() -> None:
+            guild_id, user_id = random_member()
+            await store.upsert(make_row(user_id, guild_id, rng.randint(0, 500000)))
+
+        async def top() -> None:
+            await store.top(rng.randint(1, guilds), 5)
+
+        async def rank_of() -> None:
+            guild_id, user_id = random_member()
+            await store.rank_of(guild_id, user_id)
+
+        async def at() -> None:
+            guild_id, position = random_member()
+            await store.at(guild_id, position)
+
+        for operation in (get, upsert, top, rank_of, at):
+            results[operation.__name__] = await time_operation(operation, iterations)
+
+        await store.flush()
+
+    finally:
+        backend.close()
+
+    return results
+
+
+async def main(args: argparse.Namespace) -> int:
+    backends = [Backend(name) for name in args.backends]
+    failures = 0
+    benchmark_results = {}
+
+    for backend in backends:
+        print(f"Conformance checks for {backend.name}:")
+        failures += await run_checks(backend)
+
+    if not args.skip_benchmark:
+        for backend in backends:
+            benchmark_results[backend.name] = await run_benchmark(
+                backend, args.guilds, args.members, args.iterations
+            )
+
+        operations = list(next(iter(benchmark_results.values())))
+
+        print(
+            f"\nOperations per second ({args.guilds} guilds x {args.members} members):"
+        )
+        print(f"{'':>14}" + "".join(f"{operation:>14}" for operation in operations))
+
+        for backend_name, results in benchmark_results.items():
+            print(
+                f"{backend_name:>14}"
+                + "".join(f"{results[operation]:>14.0f}" for operation in operations)
+            )
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the level store conformance checks and benchmark against every backend."
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["memory", "sqlite", "sqlite+engine"],
+        default=["memory", "sqlite", "sqlite+engine"],
+    )
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("-n", "--iterations", type=int, default=2000)
+    parser.add_argument("--skip-benchmark", action="store_true")
+    args = parser.parse_args()
+
+    raise SystemExit(1 if asyncio.run(main(args)) else 0)
@@ -0,0 +1,96 @@
+from easy_pil import Canvas, Editor, Font, Text
+from PIL import Image
+
+import argparse
+import io
+import time
+
+from utils.rank_card import render_rank_card
+
+
+def render_rank_card_from_scratch(user_data, avatar_bytes):
+    """Draw a rank card the way it was drawn before the template existed, rebuilding every layer."""
+
+    background = Editor(Canvas((900, 300), color="#23272A"))
+    profile_image = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
+    profile = Editor(profile_image).resize((190, 190)).circle_image()
+
+    poppins = Font.poppins(size=30)
+
+    background.rectangle((20, 20), 894, 260, "#2a2e35")
+    background.paste(profile, (50, 50))
+    background.ellipse(
+        (42, 42), width=206, height=206, outline="#43b581", stroke_width=10
+    )
+    background.rectangle((260, 180), width=630, height=40, fill="#484b4e", radius=20)
+    background.bar(
+        (260, 180),
+        max_width=630,
+        height=40,
+        percentage=user_data["percentage"],
+        fill="#00fa81",
+        radius=20,
+    )
+    background.text((270, 120), user_data["name"], font=poppins, color="#00fa81")
+    background.text(
+        (870, 125),
+        f"{user_data['xp']} / {user_data['next_level_xp']}",
+        font=poppins,
+        color="#00fa81",
+        align="right",
+    )
+
+    rank_level_texts = [
+        Text("Rank ", color="#00fa81", font=poppins),
+        Text(f"{user_data['rank']}", color="#1EAAFF", font=poppins),
+        Text("   Level ", color="#00fa81", font=poppins),
+        Text(f"{user_data['level']}", color="#1EAAFF", font=poppins),
+    ]
+
+    background.multi_text((850, 50), texts=rank_level_texts, align="right")
+
+    return background.image_bytes.getvalue()
+
+
+def time_renderer(renderer, user_data, avatar_bytes, iterations):
+    """Return the average amount of milliseconds a renderer takes per card."""
+
+    # Warm up once so one-time costs like the template & fonts aren't part of the timing
+    renderer(user_data, avatar_bytes)
+
+    start_time = time.perf_counter()
+
+    for _ in range(iterations):
+        renderer(user_data, avatar_bytes)
+
+    return (time.perf_counter() - start_time) / iterations * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-card render times of the rank card before and after templating."
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    user_data = {
+        "name": "FunTimes",
+        "xp": 4321,
+        "next_level_xp": 5000,
+        "level": 12,
+        "percentage": 86.42,
+        "rank": 3,
+    }
+
+    avatar_buffer = io.BytesIO()
+    Image.new("RGBA", (190, 190), "#1EAAFF").save(avatar_buffer, format="PNG")
+    avatar_bytes = avatar_buffer.getvalue()
+
+    before_ms = time_renderer(
+        render_rank_card_from_scratch, user_data, avatar_bytes, args.iterations
+    )
+    after_ms = time_renderer(render_rank_card, user_data, avatar_bytes, args.iterations)
+
+    print(f"From scratch: {before_ms:.2f}ms per card")
+    print(f"Templated:    {after_ms:.2f}ms per card")
+    print(f"Speedup:      {before_ms / after_ms:.2f}x")
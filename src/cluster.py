@@ -0,0 +1,525 @@
+from discord.ext import commands
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, Optional
+
+from main import Config, MyClient, bot_token, create_bot
+from utils.cluster_ipc import ClusterIPC
+from utils.log_pipeline import start_queue_logging
+
+logger = logging.getLogger("discord")
+
+
+class ClusterClient(MyClient, commands.AutoShardedBot):
+    """Class to be an AutoShardedBot variant of MyClient that only runs a subset of the shards.
+
+    Every cluster is its own process with its own event loop, database connections and caches.
+    Admin commands reach the other clusters through the IPC channel to the supervisor.
+    """
+
+    def __init__(self, *args, cluster_ipc: ClusterIPC, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cluster_ipc = cluster_ipc
+        self.owned_shard_ids = frozenset(self.shard_ids)
+
+    def load_config(self):
+        """Create a config obj that logs to a file of this cluster's own."""
+
+        config_obj = Config(log_prefix=f"cluster-{self.cluster_ipc.cluster_id}-")
+        config_obj.setup()
+
+        self.config = config_obj
+
+    def owns_guild(self, guild_id):
+        """Whether the guild is on one of this cluster's shards."""
+
+        return (guild_id >> 22) % self.shard_count in self.owned_shard_ids
+
+    async def setup_hook(self):
+        """Connect to the supervisor before running the regular setup."""
+
+        self.cluster_ipc.on_shutdown = self.close
+        self.cluster_ipc.start()
+        logger.info(
+            "Cluster %s is running shards %s of %s.",
+            self.cluster_ipc.cluster_id,
+            sorted(self.owned_shard_ids),
+            self.shard_count,
+        )
+
+        await super().setup_hook()
+
+
+class StandInCluster:
+    """Class to stand in for a ClusterClient without connecting to the Discord gateway.
+
+    It answers the same IPC commands with made up data, so the supervisor, restarts and
+    broadcasts can be tried out locally without a bot token.
+    """
+
+    GUILDS_PER_SHARD = 25
+
+    def __init__(
+        self,
+        cluster_ipc: ClusterIPC,
+        shard_ids: List[int],
+        crash_after: Optional[float] = None,
+    ) -> None:
+        self.cluster_ipc = cluster_ipc
+        self.shard_ids = shard_ids
+        self.crash_after = crash_after
+        self.start_time = time.time()
+        self.closed = asyncio.Event()
+
+    async def info(self) -> Dict[str, Any]:
+        return {
+            "guilds": len(self.shard_ids) * self.GUILDS_PER_SHARD,
+            "latency": 0.05,
+            "shard_ids": self.shard_ids,
+            "pid": os.getpid(),
+            "uptime": time.time() - self.start_time,
+        }
+
+    async def reload(self, extension: str = None, **_: Any) -> Dict[str, List[str]]:
+        return {"reloaded": [f"cogs.stand_in.{extension or 'all'}"], "loaded": []}
+
+    async def close(self) -> None:
+        self.closed.set()
+
+    async def run(self) -> None:
+        """Serve IPC commands until the supervisor shuts this cluster down."""
+
+        self.cluster_ipc.register("info", self.info)
+        self.cluster_ipc.register("reload", self.reload)
+        self.cluster_ipc.on_shutdown = self.close
+        self.cluster_ipc.start()
+
+        logger.info(
+            "Stand-in cluster %s is running shards %s.",
+            self.cluster_ipc.cluster_id,
+            self.shard_ids,
+        )
+
+        # Let the first cluster exercise a broadcast once everything had a chance to start
+        if self.cluster_ipc.cluster_id == 0:
+            await asyncio.sleep(2)
+            responses = await self.cluster_ipc.broadcast("info", timeout=5)
+
+            for cluster_id, response in sorted(responses.items()):
+                logger.info("Broadcast response of cluster %s: %s", cluster_id, response)
+
+        try:
+            await asyncio.wait_for(self.closed.wait(), self.crash_after)
+
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Stand-in cluster %s is crashing on purpose.", self.cluster_ipc.cluster_id
+            )
+            os._exit(1)
+
+
+def setup_stream_logging() -> None:
+    """Log to stderr, so the supervisor & stand-in clusters can be followed in a terminal."""
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter(
+            "[ %(asctime)s ] [ %(levelname)-8s] [ %(processName)-12s ] :: %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+    )
+
+    logger.setLevel(logging.INFO)
+    start_queue_logging(logger, handler)
+
+
+async def run_cluster_client(
+    cluster_ipc: ClusterIPC, shard_ids: List[int], shard_count: int
+) -> None:
+    """Start a ClusterClient over its shards."""
+
+    bot = create_bot(
+        ClusterClient,
+        cluster_ipc=cluster_ipc,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+    )
+
+    async with bot:
+        await bot.start(bot_token)
+
+
+def run_cluster(
+    cluster_id: int,
+    shard_ids: List[int],
+    shard_count: int,
+    connection: Connection,
+    stand_in: bool,
+    crash_after: Optional[float],
+) -> None:
+    """Entry point of a cluster process."""
+
+    cluster_ipc = ClusterIPC(cluster_id, connection)
+
+    try:
+        if stand_in:
+            setup_stream_logging()
+            asyncio.run(StandInCluster(cluster_ipc, shard_ids, crash_after).run())
+        else:
+            asyncio.run(run_cluster_client(cluster_ipc, shard_ids, shard_count))
+
+    except KeyboardInterrupt:
+        # The supervisor decides what happens next
+        pass
+
+
+class PendingBroadcast:
+    """A broadcast that is still waiting for responses."""
+
+    def __init__(self, requester: int, expected: List[int], timeout: float) -> None:
+        self.requester = requester
+        self.expected = set(expected)
+        self.responses: Dict[int, Dict[str, Any]] = {}
+        self.deadline = time.monotonic() + timeout
+
+
+class ClusterSupervisor:
+    """Class to start every cluster process, restart them when they crash and route IPC messages between them.
+
+    Crashed clusters are restarted with an exponential backoff that resets once a cluster stays up for a while.
+    """
+
+    STABLE_UPTIME = 60
+    SHUTDOWN_TIMEOUT = 30
+
+    def __init__(
+        self,
+        cluster_count: int,
+        shard_count: int,
+        stand_in: bool = False,
+        crash_after: Optional[float] = None,
+        launch_interval: float = 5,
+        max_restart_delay: float = 300,
+    ) -> None:
+        if not 1 <= cluster_count <= shard_count:
+            raise ValueError("There must be between 1 cluster and 1 cluster per shard.")
+
+        self.shard_count = shard_count
+        self.stand_in = stand_in
+        self.crash_after = crash_after
+        self.max_restart_delay = max_restart_delay
+
+        # Clusters get consecutive shard IDs, e.g. 2 clusters over 5 shards -> [0, 1] & [2, 3, 4]
+        self.shard_groups = [
+            list(
+                range(
+                    cluster_id * shard_count // cluster_count,
+                    (cluster_id + 1) * shard_count // cluster_count,
+                )
+            )
+            for cluster_id in range(cluster_count)
+        ]
+
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.process.BaseProcess] = {}
+        self.connections: Dict[int, Connection] = {}
+        self.started_at: Dict[int, float] = {}
+        self.restart_delays: Dict[int, float] = {}
+        self.pending_broadcasts: Dict[str, PendingBroadcast] = {}
+
+        # Launches are spread out so the clusters don't all identify with the gateway at once
+        now = time.monotonic()
+        self.launch_at: Dict[int, float] = {
+            cluster_id: now + cluster_id * launch_interval
+            for cluster_id in range(cluster_count)
+        }
+
+        self.stopping = False
+        self.stop_deadline = 0.0
+
+    def start_cluster(self, cluster_id: int) -> None:
+        parent_connection, child_connection = self.context.Pipe()
+
+        process = self.context.Process(
+            target=run_cluster,
+            args=(
+                cluster_id,
+                self.shard_groups[cluster_id],
+                self.shard_count,
+                child_connection,
+                self.stand_in,
+                self.crash_after,
+            ),
+            name=f"cluster-{cluster_id}",
+        )
+        process.start()
+
+        # The child holds the only other end, so its death shows up as EOF on ours
+        child_connection.close()
+
+        self.processes[cluster_id] = process
+        self.connections[cluster_id] = parent_connection
+        self.started_at[cluster_id] = time.monotonic()
+
+        logger.info(
+            "Cluster %s started (PID: %s) with shards %s.",
+            cluster_id,
+            process.pid,
+            self.shard_groups[cluster_id],
+        )
+
+    def stop(self) -> None:
+        """Ask every cluster to shut down and stop restarting them."""
+
+        if self.stopping:
+            return
+
+        logger.info("Shutting down all clusters.")
+
+        self.stopping = True
+        self.stop_deadline = time.monotonic() + self.SHUTDOWN_TIMEOUT
+        self.launch_at.clear()
+
+        for cluster_id in list(self.connections):
+            self.send(cluster_id, {"op": "shutdown"})
+
+    def send(self, cluster_id: int, message: Dict[str, Any]) -> None:
+        connection = self.connections.get(cluster_id)
+
+        if connection is None:
+            return
+
+        try:
+            connection.send(message)
+
+        except (BrokenPipeError, OSError):
+            # The exit of the process gets handled through its sentinel
+            pass
+
+    def run(self) -> None:
+        """Supervise the clusters until they have all been shut down."""
+
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+
+        while not (self.stopping and not self.processes):
+            try:
+                self.supervise()
+
+            except KeyboardInterrupt:
+                self.stop()
+
+        logger.info("All clusters have been shut down.")
+
+    def supervise(self) -> None:
+        """Run one round of launching, message routing and exit handling."""
+
+        now = time.monotonic()
+
+        for cluster_id, launch_time in list(self.launch_at.items()):
+            if launch_time <= now:
+                del self.launch_at[cluster_id]
+                self.start_cluster(cluster_id)
+
+        if self.stopping and now >= self.stop_deadline:
+            for cluster_id, process in self.processes.items():
+                logger.warning(
+                    "Cluster %s didn't shut down in time and is being terminated.",
+                    cluster_id,
+                )
+                process.terminate()
+
+            self.stop_deadline = float("inf")
+
+        cluster_ids_by_waitable = {
+            connection: cluster_id for cluster_id, connection in self.connections.items()
+        }
+        cluster_ids_by_waitable.update(
+            {process.sentinel: cluster_id for cluster_id, process in self.processes.items()}
+        )
+
+        if cluster_ids_by_waitable:
+            ready = wait(list(cluster_ids_by_waitable), timeout=1)
+        else:
+            time.sleep(1)
+            ready = []
+
+        for waitable in ready:
+            cluster_id = cluster_ids_by_waitable[waitable]
+
+            if isinstance(waitable, Connection):
+                self.receive(cluster_id, waitable)
+
+        # Exits are handled after the messages, so a cluster's last messages are never lost
+        for waitable in ready:
+            if not isinstance(waitable, Connection):
+                self.handle_exit(cluster_ids_by_waitable[waitable])
+
+        for request_id, pending_broadcast in list(self.pending_broadcasts.items()):
+            if pending_broadcast.deadline <= time.monotonic():
+                self.finish_broadcast(request_id)
+
+    def receive(self, cluster_id: int, connection: Connection) -> None:
+        """Handle every message that is waiting on a cluster's connection."""
+
+        try:
+            while connection.poll():
+                self.handle_message(cluster_id, connection.recv())
+
+        except (EOFError, OSError):
+            self.connections.pop(cluster_id, None)
+            connection.close()
+
+    def handle_message(self, cluster_id: int, message: Dict[str, Any]) -> None:
+        if message["op"] == "broadcast":
+            self.pending_broadcasts[message["id"]] = PendingBroadcast(
+                cluster_id, list(self.connections), message["timeout"]
+            )
+
+            for target_cluster_id in list(self.connections):
+                self.send(
+                    target_cluster_id,
+                    {
+                        "op": "execute",
+                        "id": message["id"],
+                        "command": message["command"],
+                        "args": message["args"],
+                    },
+                )
+
+        elif message["op"] == "response":
+            self.record_response(message["id"], message["cluster_id"], message)
+
+        elif message["op"] == "shutdown_all":
+            logger.info("Cluster %s requested a shutdown.", cluster_id)
+            self.stop()
+
+    def record_response(
+        self, request_id: str, cluster_id: int, response: Dict[str, Any]
+    ) -> None:
+        pending_broadcast = self.pending_broadcasts.get(request_id)
+
+        if pending_broadcast is None:
+            return
+
+        pending_broadcast.responses[cluster_id] = {
+            key: value
+            for key, value in response.items()
+            if key in ("ok", "result", "error")
+        }
+
+        if pending_broadcast.expected <= pending_broadcast.responses.keys():
+            self.finish_broadcast(request_id)
+
+    def finish_broadcast(self, request_id: str) -> None:
+        """Send every response of a broadcast back to the cluster that asked for it."""
+
+        pending_broadcast = self.pending_broadcasts.pop(request_id)
+
+        responses = {
+            cluster_id: pending_broadcast.responses.get(
+                cluster_id, {"ok": False, "error": "Timed out"}
+            )
+            for cluster_id in pending_broadcast.expected
+        }
+
+        self.send(
+            pending_broadcast.requester,
+            {"op": "aggregate", "id": request_id, "results": responses},
+        )
+
+    def handle_exit(self, cluster_id: int) -> None:
+        """Clean up after a cluster process and schedule its restart."""
+
+        process = self.processes.pop(cluster_id)
+        process.join()
+
+        connection = self.connections.pop(cluster_id, None)
+
+        if connection:
+            connection.close()
+
+        # A cluster that exits can't answer the broadcasts it was part of
+        for request_id, pending_broadcast in list(self.pending_broadcasts.items()):
+            if cluster_id in pending_broadcast.expected:
+                self.record_response(
+                    request_id,
+                    cluster_id,
+                    {"ok": False, "error": "Cluster exited"},
+                )
+
+        if self.stopping:
+            logger.info("Cluster %s has shut down.", cluster_id)
+            return
+
+        uptime = time.monotonic() - self.started_at[cluster_id]
+
+        if uptime >= self.STABLE_UPTIME:
+            self.restart_delays[cluster_id] = 1
+
+        restart_delay = self.restart_delays.get(cluster_id, 1)
+        self.restart_delays[cluster_id] = min(restart_delay * 2, self.max_restart_delay)
+        self.launch_at[cluster_id] = time.monotonic() + restart_delay
+
+        logger.error(
+            "Cluster %s exited with code %s after %.0fs. Restarting it in %.0fs.",
+            cluster_id,
+            process.exitcode,
+            uptime,
+            restart_delay,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run the bot as multiple processes that each handle a subset of the shards."
+    )
+    parser.add_argument("--clusters", type=int, default=2)
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument(
+        "--launch-interval",
+        type=float,
+        default=5,
+        help="Seconds between launching each cluster.",
+    )
+    parser.add_argument(
+        "--stand-in",
+        action="store_true",
+        help="Run stand-in clusters that don't connect to Discord, for testing locally.",
+    )
+    parser.add_argument(
+        "--crash-after",
+        type=float,
+        default=None,
+        help="Make every stand-in cluster crash after this many seconds to test restarts.",
+    )
+    args = parser.parse_args()
+
+    if args.crash_after is not None and not args.stand_in:
+        parser.error("--crash-after can only be used with --stand-in")
+
+    # The supervisor logs next to the clusters and to the terminal
+    config = Config(log_prefix="supervisor-")
+    config.setup_storage()
+    config.setup_logger()
+    setup_stream_logging()
+
+    try:
+        supervisor = ClusterSupervisor(
+            args.clusters,
+            args.shards,
+            stand_in=args.stand_in,
+            crash_after=args.crash_after,
+            launch_interval=args.launch_interval,
+        )
+
+    except ValueError as error:
+        parser.error(str(error))
+
+    supervisor.run()
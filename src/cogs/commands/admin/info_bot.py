@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 
+import os
 import time
 import platform
 import psutil
@@ -8,6 +9,8 @@ import shutil
 import cpuinfo
 import subprocess
 
+from typing import Any, Dict
+
 from utils.decorators.is_bot_admin import is_bot_admin
 
 
@@ -17,6 +20,25 @@ class InfoBot(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
 
+    async def cog_load(self) -> None:
+        # Let the info command of any cluster include this one
+        if self.bot.cluster_ipc:
+            self.bot.cluster_ipc.register("info", self.cluster_info)
+
+    async def cluster_info(self) -> Dict[str, Any]:
+        """Return the information about this process that is shown per cluster."""
+
+        return {
+            "guilds": len(self.bot.guilds),
+            "latency": self.bot.latency,
+            # Only an AutoShardedBot has shard_ids
+            "shard_ids": sorted(
+                getattr(self.bot, "shard_ids", None) or [self.bot.shard_id or 0]
+            ),
+            "pid": os.getpid(),
+            "uptime": time.time() - self.bot.start_time,
+        }
+
     def convert_seconds(self, seconds: int) -> str:
         """Convert an amount of a seconds into a time period string."""
 
@@ -110,6 +132,19 @@ class InfoBot(commands.Cog):
                 if curr_package_name == "discord.py":
                     discord_version = curr_package_version
 
+        # needed for guild & ping info across every cluster
+        if self.bot.cluster_ipc:
+            cluster_responses = await self.bot.cluster_ipc.broadcast("info")
+        else:
+            cluster_responses = {0: {"ok": True, "result": await self.cluster_info()}}
+
+        cluster_infos = {
+            cluster_id: cluster_response["result"]
+            for cluster_id, cluster_response in cluster_responses.items()
+            if cluster_response["ok"]
+        }
+        guild_count = sum(cluster_info["guilds"] for cluster_info in cluster_infos.values())
+
         # needed for getting number of commands
         app_commands_amount = len(self.bot.tree.get_commands())
         text_commands_amount = len(self.bot.commands)
@@ -128,8 +163,20 @@ class InfoBot(commands.Cog):
         )
         info_embed.add_field(
             name="🌎 Guilds",
-            value=f"``` {app_info.name} is in {len(self.bot.guilds)} guilds ```",
+            value=f"``` {app_info.name} is in {guild_count} guilds ```",
         )
+        if self.bot.cluster_ipc:
+            clusters_str = "\n".join(
+                f" Cluster {cluster_id}: shards {cluster_infos[cluster_id]['shard_ids']}, {cluster_infos[cluster_id]['guilds']} guilds, {round(cluster_infos[cluster_id]['latency'] * 1000)}ms, up {self.convert_seconds(int(cluster_infos[cluster_id]['uptime']))}"
+                if cluster_id in cluster_infos
+                else f" Cluster {cluster_id}: {cluster_response['error']}"
+                for cluster_id, cluster_response in sorted(cluster_responses.items())
+            )
+            info_embed.add_field(
+                name="🧩 Clusters",
+                value=f"```{clusters_str} ```",
+                inline=False,
+            )
         info_embed.add_field(
             name="📶 Ping",
             value=f"``` {round(self.bot.latency * 1000)}ms ```",
@@ -159,6 +206,34 @@ class InfoBot(commands.Cog):
             name="<:discord_py:979123557898543134> Discord.py Version",
             value=f"``` {discord_version} ```",
         )
+        user_cache_stats = self.bot.user_cache.stats()
+        info_embed.add_field(
+            name="👥 User Cache",
+            value=f"``` Gateway Hits: {user_cache_stats['gateway_hits']} \n Profile Hits: {user_cache_stats['profile_hits']} \n Collapsed Fetches: {user_cache_stats['collapsed_fetches']} \n Misses: {user_cache_stats['misses']} ```",
+            inline=False,
+        )
+        avatar_cache_stats = self.bot.avatar_cache.stats()
+        info_embed.add_field(
+            name="🖼️ Avatar Cache",
+            value=f"``` Memory Hits: {avatar_cache_stats['memory_hits']} \n Disk Hits: {avatar_cache_stats['disk_hits']} \n Network Fetches: {avatar_cache_stats['network_fetches']} ```",
+            inline=False,
+        )
+        rank_card_cache_stats = self.bot.rank_card_cache.stats()
+        info_embed.add_field(
+            name="🏅 Rank Card Cache",
+            value=f"``` Hits: {rank_card_cache_stats['hits']} \n Misses: {rank_card_cache_stats['misses']} \n Cached Cards: {rank_card_cache_stats['entries']} ```",
+            inline=False,
+        )
+        rest_scheduler_metrics = self.bot.rest_scheduler.metrics()
+        rest_scheduler_str = "\n".join(
+            f" {priority_name.title()}: {priority_metrics['completed']} sent, {priority_metrics['rejected']} rejected, {priority_metrics['average_wait'] * 1000:.0f}ms avg / {priority_metrics['max_wait'] * 1000:.0f}ms max wait"
+            for priority_name, priority_metrics in rest_scheduler_metrics.items()
+        )
+        info_embed.add_field(
+            name="📤 REST Scheduler",
+            value=f"```{rest_scheduler_str} ```",
+            inline=False,
+        )
         info_embed.add_field(
             name="👑 Commands",
             value=f"``` # of App-Commands: {app_commands_amount} \n # of Text-Commands: {text_commands_amount} ```",
@@ -0,0 +1,83 @@
+import discord
+from discord.ext import commands
+
+from utils.decorators.is_bot_admin import is_bot_admin
+
+
+class LevelStats(commands.Cog):
+    """Cog to handle commands regarding the in-memory level systems of the bot."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+
+    def convert_bytes(self, amount: int) -> str:
+        """Convert an amount of bytes into a human readable string."""
+
+        for suffix in ["B", "KB", "MB"]:
+            if amount < 1024:
+                return f"{amount:.1f}{suffix}"
+
+            amount /= 1024
+
+        return f"{amount:.1f}GB"
+
+    @commands.command(
+        aliases=["lvlstats"], extras={"required_user_permissions":["funtimes_bot_admin"]}
+    )
+    @is_bot_admin()
+    async def level_stats(self, ctx: commands.Context) -> None:
+        """Display the memory footprint of the leaderboard engine per guild, XP ingest metrics and level up stats."""
+
+        memory_report = self.bot.leaderboard_engine.memory_report()
+
+        total_members = sum(member_count for member_count, _ in memory_report.values())
+        total_bytes = sum(guild_bytes for _, guild_bytes in memory_report.values())
+
+        stats_embed = discord.Embed(colour=discord.Colour.from_str("#c30008"))
+
+        stats_embed.add_field(
+            name="🏆 Leaderboard Engine",
+            value=f"``` Guilds: {len(memory_report)} \n Ranked Members: {total_members} \n Memory: {self.convert_bytes(total_bytes)} ```",
+            inline=False,
+        )
+
+        on_message_cog = self.bot.get_cog("OnMessage")
+
+        if on_message_cog:
+            ingest_metrics = on_message_cog.xp_ingest_queue.metrics()
+
+            stats_embed.add_field(
+                name="📥 XP Ingest Queue",
+                value=f"``` Depth: {ingest_metrics['depth']} \n Processed: {ingest_metrics['processed']} \n Merged: {ingest_metrics['merged']} \n Dropped: {ingest_metrics['dropped']} \n Failed: {ingest_metrics['failed']} \n Lag (last/avg/max): {ingest_metrics['last_lag']:.3f}s / {ingest_metrics['average_lag']:.3f}s / {ingest_metrics['max_lag']:.3f}s ```",
+                inline=False,
+            )
+
+            announcer_stats = on_message_cog.level_up_announcer.stats()
+
+            stats_embed.add_field(
+                name="📣 Level Up Announcements",
+                value=f"``` Level Ups: {announcer_stats['announced_level_ups']} \n Messages Sent: {announcer_stats['messages_sent']} ```",
+                inline=False,
+            )
+
+        # Only show the guilds that take up the most memory
+        largest_guilds = sorted(
+            memory_report.items(), key=lambda item: item[1][1], reverse=True
+        )[:10]
+
+        largest_guilds_str = "\n".join(
+            f" {self.bot.get_guild(guild_id) or guild_id}: {member_count} members, {self.convert_bytes(guild_bytes)}"
+            for guild_id, (member_count, guild_bytes) in largest_guilds
+        )
+
+        stats_embed.add_field(
+            name="💾 Largest Guilds",
+            value=f"```{largest_guilds_str or ' No level data yet.'} ```",
+            inline=False,
+        )
+
+        await ctx.reply(embed=stats_embed)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(LevelStats(bot))
@@ -0,0 +1,55 @@
+import discord
+from discord.ext import commands
+
+from utils.decorators.is_bot_admin import is_bot_admin
+
+
+class BotMetrics(commands.Cog):
+    """Cog to handle commands regarding the command & event metrics of the bot."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+
+    def format_metrics(self, kind: str) -> str:
+        """Summarize the busiest commands or events of a kind, one per line."""
+
+        lines = []
+
+        for name, metric in self.bot.metrics.summary(kind)[:10]:
+            average = metric.total_duration / metric.count if metric.count else 0
+
+            lines.append(
+                f" {name}: {metric.count} calls, {metric.errors} errors, {metric.in_flight} running, avg {average * 1000:.1f}ms, p95 ≤{metric.quantile(0.95) * 1000:g}ms"
+            )
+
+        # Leaves room for the code block within the 1024 character limit of a field
+        return "\n".join(lines)[:1000] or " Nothing recorded yet."
+
+    @commands.command(extras={"required_user_permissions":["funtimes_bot_admin"]})
+    @is_bot_admin()
+    async def metrics(self, ctx: commands.Context) -> None:
+        """Display the latency, errors and in-flight count of the busiest commands and events."""
+
+        metrics_embed = discord.Embed(colour=discord.Colour.from_str("#c30008"))
+
+        metrics_embed.add_field(
+            name="⌨️ Commands",
+            value=f"```{self.format_metrics('command')} ```",
+            inline=False,
+        )
+        metrics_embed.add_field(
+            name="📡 Events",
+            value=f"```{self.format_metrics('event')} ```",
+            inline=False,
+        )
+
+        if getattr(self.bot, "metrics_server", None):
+            metrics_embed.set_footer(
+                text=f"Full metrics at http://{self.bot.metrics_server.host}:{self.bot.metrics_server.port}/metrics"
+            )
+
+        await ctx.reply(embed=metrics_embed)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(BotMetrics(bot))
@@ -0,0 +1,68 @@
+import discord
+from discord.ext import commands
+
+import logging
+from typing import List, Tuple
+
+from utils.decorators.is_bot_admin import is_bot_admin
+from utils.level_migration import relevel_database
+
+logger = logging.getLogger("discord")
+
+
+class Relevel(commands.Cog):
+    """Cog for recomputing the level of every member from the current level curve."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        self.is_relevelling = False
+
+    def apply_updates(self, updates: List[Tuple[int, int, int, int]]) -> None:
+        """Keep the leaderboard engine in sync with the levels that were just written."""
+
+        for level, user_id, guild_id, experience in updates:
+            self.bot.leaderboard_engine.update(guild_id, user_id, experience, level)
+
+    @commands.command(extras={"required_user_permissions":["funtimes_bot_admin"]})
+    @is_bot_admin()
+    async def relevel(self, ctx: commands.Context, apply: bool = False) -> None:
+        """Recompute every member's level. Only a dry run unless apply is true. Restricted to bot admins."""
+
+        if self.is_relevelling:
+            await ctx.reply("Bot is already in the process of relevelling members.")
+            return
+
+        self.is_relevelling = True
+
+        try:
+            # Buffered XP has to reach the db before each pass so those rows are relevelled too
+            report = await relevel_database(
+                self.bot.db,
+                self.bot.level_curve,
+                dry_run=not apply,
+                on_updates=self.apply_updates,
+                flush=self.bot.level_store.flush,
+            )
+
+        finally:
+            self.is_relevelling = False
+
+        logger.info(
+            "Relevel (dry run: %s) requested by %s (UserID: %s) finished. %s",
+            not apply,
+            ctx.author,
+            ctx.author.id,
+            report.summary().replace("\n", " "),
+        )
+
+        relevel_embed = discord.Embed(
+            colour=discord.Colour.from_str("#c30008"),
+            title="Relevel Dry Run" if not apply else "Relevel",
+            description=f"```{report.summary()[:4000]}```",
+        )
+
+        await ctx.reply(embed=relevel_embed)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(Relevel(bot))
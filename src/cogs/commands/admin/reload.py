@@ -1,6 +1,7 @@
 from discord.ext import commands
 
 import logging
+from typing import Dict, List, Optional
 
 from utils.extension_paths import get_extension_paths
 from utils.decorators.is_bot_admin import is_bot_admin
@@ -14,16 +15,21 @@ class Reload(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
 
-    @commands.command(extras={"required_user_permissions":["funtimes_bot_admin"]})
-    @is_bot_admin()
-    async def reload(self, ctx: commands.Context, extension: str = None) -> None:
-        """Reload one or multiple extensions. Restricted to bot admins."""
+    async def cog_load(self) -> None:
+        # Let the other clusters reload this one's extensions too
+        if self.bot.cluster_ipc:
+            self.bot.cluster_ipc.register("reload", self.reload_extensions)
+
+    async def reload_extensions(
+        self, extension: Optional[str], author_name: str, author_id: int
+    ) -> Dict[str, List[str]]:
+        """Reload one or multiple extensions and return which ones were reloaded & loaded."""
 
         extension_paths = get_extension_paths()
         extensions_to_reload = []
 
-        reloaded_extensions = set()
-        loaded_extensions = set()
+        reloaded_extensions = []
+        loaded_extensions = []
 
         if extension == None:
             # Set the specified extensions to be all the ones currently available
@@ -47,20 +53,19 @@ class Reload(commands.Cog):
                 extension,
             )
 
-            await ctx.send("**No extensions were reloaded/loaded.**")
-            return
+            return {"reloaded": reloaded_extensions, "loaded": loaded_extensions}
 
         # Reload the specified extensions
         for curr_extension in extensions_to_reload:
             try:
                 await self.bot.reload_extension(curr_extension)
-                reloaded_extensions.add(curr_extension)
+                reloaded_extensions.append(curr_extension)
 
                 logger.info(
                     "Extension '%s' reloaded by %s (UserID: %s)",
                     curr_extension,
-                    ctx.author,
-                    ctx.author.id,
+                    author_name,
+                    author_id,
                 )
 
             except commands.ExtensionNotLoaded:
@@ -71,13 +76,13 @@ class Reload(commands.Cog):
 
                 try:
                     await self.bot.load_extension(curr_extension)
-                    loaded_extensions.add(curr_extension)
+                    loaded_extensions.append(curr_extension)
 
                     logger.info(
                         "Extension '%s' loaded by %s (UserID: %s)",
                         curr_extension,
-                        ctx.author,
-                        ctx.author.id,
+                        author_name,
+                        author_id,
                     )
 
                 except commands.NoEntryPointError as error:
@@ -97,6 +102,50 @@ class Reload(commands.Cog):
                         exc_info=error,
                     )
 
+        return {"reloaded": reloaded_extensions, "loaded": loaded_extensions}
+
+    @commands.command(extras={"required_user_permissions":["funtimes_bot_admin"]})
+    @is_bot_admin()
+    async def reload(self, ctx: commands.Context, extension: str = None) -> None:
+        """Reload one or multiple extensions on every cluster. Restricted to bot admins."""
+
+        if self.bot.cluster_ipc:
+            cluster_responses = await self.bot.cluster_ipc.broadcast(
+                "reload",
+                extension=extension,
+                author_name=str(ctx.author),
+                author_id=ctx.author.id,
+            )
+
+        else:
+            cluster_responses = {
+                0: {
+                    "ok": True,
+                    "result": await self.reload_extensions(
+                        extension, str(ctx.author), ctx.author.id
+                    ),
+                }
+            }
+
+        reloaded_extensions = set()
+        loaded_extensions = set()
+        failed_clusters = []
+
+        for cluster_id, cluster_response in sorted(cluster_responses.items()):
+            if cluster_response["ok"]:
+                reloaded_extensions.update(cluster_response["result"]["reloaded"])
+                loaded_extensions.update(cluster_response["result"]["loaded"])
+
+            else:
+                failed_clusters.append(
+                    f"- Cluster {cluster_id}: {cluster_response['error']}\n"
+                )
+
+        # Return early if no extension paths were found
+        if not reloaded_extensions and not loaded_extensions and not failed_clusters:
+            await ctx.send("**No extensions were reloaded/loaded.**")
+            return
+
         # Display output to user
         output_msg = ""
 
@@ -116,6 +165,10 @@ class Reload(commands.Cog):
 
             output_msg += f"\n{loaded_msg}"
 
+        if failed_clusters:
+            output_msg += "\n**The following cluster(s) failed to reload:**\n"
+            output_msg += "".join(failed_clusters)
+
         await ctx.reply(output_msg)
 
 
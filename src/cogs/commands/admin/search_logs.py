@@ -0,0 +1,109 @@
+import discord
+from discord.ext import commands
+
+import asyncio
+import io
+import logging
+from datetime import datetime
+from typing import Optional
+
+from utils.decorators.is_bot_admin import is_bot_admin
+from utils.log_archive import LogQuery, search_logs
+
+logger = logging.getLogger("discord")
+
+
+class LogSearchFlags(commands.FlagConverter):
+    """Filters for the search_logs command, e.g. `level: ERROR user: 1234 since: 2024-07-01`."""
+
+    level: Optional[str] = None
+    function: Optional[str] = None
+    user: Optional[int] = None
+    guild: Optional[int] = None
+    text: Optional[str] = None
+    since: Optional[str] = None
+    until: Optional[str] = None
+    limit: int = 50
+
+
+class SearchLogs(commands.Cog):
+    """Cog for searching the archived logs of the bot."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+
+    @commands.command(
+        aliases=["logs"], extras={"required_user_permissions":["funtimes_bot_admin"]}
+    )
+    @is_bot_admin()
+    async def search_logs(
+        self, ctx: commands.Context, *, flags: LogSearchFlags
+    ) -> None:
+        """Search the logs by level, function, user, guild, text and date. Only archives whose index may hold a match are read."""
+
+        try:
+            query = LogQuery(
+                levels=frozenset([flags.level.upper()] if flags.level else []),
+                functions=frozenset([flags.function] if flags.function else []),
+                user_ids=frozenset([flags.user] if flags.user else []),
+                guild_ids=frozenset([flags.guild] if flags.guild else []),
+                text=flags.text,
+                since=datetime.strptime(flags.since, "%Y-%m-%d").date()
+                if flags.since
+                else None,
+                until=datetime.strptime(flags.until, "%Y-%m-%d").date()
+                if flags.until
+                else None,
+            )
+
+        except ValueError:
+            await ctx.reply("Sorry! Dates must be formatted as YYYY-MM-DD.")
+            return
+
+        # Decompressing archives blocks, so it happens on a worker thread
+        result = await asyncio.to_thread(
+            search_logs,
+            self.bot.config.dir_paths["logs"],
+            query,
+            None,
+            min(max(flags.limit, 1), 500),
+        )
+
+        search_embed = discord.Embed(
+            colour=discord.Colour.from_str("#c30008"), title="Log Search"
+        )
+        search_embed.add_field(
+            name="🔎 Results",
+            value=f"``` Records: {len(result.records)} \n Log Files Read: {result.scanned_files} / {result.log_files} \n Duration: {result.duration:.2f}s ```",
+            inline=False,
+        )
+
+        logger.info(
+            "Logs searched by %s (UserID: %s, GuildID: %s): %s records in %s of %s log files.",
+            ctx.author,
+            ctx.author.id,
+            ctx.guild.id if ctx.guild else None,
+            len(result.records),
+            result.scanned_files,
+            result.log_files,
+        )
+
+        if not result.records:
+            await ctx.reply(embed=search_embed)
+            return
+
+        # Records can be long, e.g. tracebacks, so they are sent as a file instead of in the embed
+        records_file = discord.File(
+            io.BytesIO(
+                "".join(
+                    f"{log_file}: {record}" for log_file, record in result.records
+                ).encode()
+            ),
+            filename="log_search.txt",
+        )
+
+        await ctx.reply(embed=search_embed, file=records_file)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(SearchLogs(bot))
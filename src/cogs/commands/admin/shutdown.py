@@ -21,7 +21,15 @@ class Shutdown(commands.Cog):
         """Shut down the bot. Can only be used by bot admins."""
 
         await ctx.send(f"{self.bot.application.name} is now shutting down.")
-        await self.bot.close()
+
+        # Write any buffered XP before the connection goes away
+        await self.bot.level_store.flush()
+
+        # The supervisor would otherwise restart this cluster, so it shuts every cluster down instead
+        if self.bot.cluster_ipc:
+            self.bot.cluster_ipc.request_shutdown()
+        else:
+            await self.bot.close()
 
         logger.info(
             "Bot '%s' is now shutting down. Requested by %s (UserID: %s, GuildID: %s)",
@@ -22,19 +22,19 @@ class Leaderboard(commands.Cog):
             colour=discord.Colour.from_str("#02f4fd"),
         )
 
-        cur = self.bot.db.cursor()
-
-        res = cur.execute(
-            "SELECT user_id, experience, level FROM level WHERE guild_id=? ORDER BY experience DESC LIMIT 5",
-            (ctx.guild.id,),
-        ).fetchall()
+        res = await self.bot.level_store.top(ctx.guild.id, 5)
 
         if len(res) == 5:
             medals = ["🥇", "🥈", "🥉", "🏅", "🏅"]
 
+            # Resolve every member at once so any REST fetches run concurrently
+            users = await self.bot.user_cache.get_users(
+                [row[0] for row in res], ctx.guild
+            )
+
             for i in range(5):
                 leaderboard_embed.add_field(
-                    name=f"{medals[i]} {await self.bot.fetch_user(res[i][0])}",
+                    name=f"{medals[i]} {users[i]}",
                     value=f"Level: {res[i][2]} ⚬ EXP: {res[i][1]}",
                     inline=False,
                 )
@@ -44,34 +44,27 @@ class Leaderboard(commands.Cog):
                 "**Not enough user data to create a leaderboard!**"
             )
 
-        await ctx.reply(embed=leaderboard_embed)
-
-        cur.close()
+        await self.bot.rest_scheduler.reply(ctx, embed=leaderboard_embed)
 
     @commands.hybrid_command(name="server-position", aliases=["sp", "rp"])
     @commands.guild_only()
     async def server_position(self, ctx: commands.Context, position: int) -> None:
         """Display the member at a specific leaderboard rank position."""
 
-        cur = self.bot.db.cursor()
-
-        res = cur.execute(
-            "SELECT user_id, experience, level FROM level WHERE guild_id=? ORDER BY experience DESC LIMIT ?",
-            (ctx.guild.id, position),
-        ).fetchall()
+        res = await self.bot.level_store.at(ctx.guild.id, position)
 
         server_position_embed = discord.Embed(colour=discord.Colour.from_str("#02f4fd"))
 
-        if len(res) == position:
+        if res:
             user_data = {
-                "user_id": res[-1][0],
-                "experience": res[-1][1],
-                "level": res[-1][2],
+                "user_id": res[0],
+                "experience": res[1],
+                "level": res[2],
             }
 
             server_position_embed.title = f"**Level Stats for #{position}**"
             server_position_embed.description = (
-                f"**User: {await self.bot.fetch_user(user_data['user_id'])}**"
+                f"**User: {await self.bot.user_cache.get_user(user_data['user_id'], ctx.guild)}**"
             )
 
             server_position_embed.add_field(
@@ -84,7 +77,7 @@ class Leaderboard(commands.Cog):
             )
             server_position_embed.add_field(
                 name="⁉️ XP Until Level Up",
-                value=f"Required XP: {abs(int(62 * ((user_data['level'] + 1) ** (20 / 11))) - user_data['experience'])}",
+                value=f"Required XP: {self.bot.level_curve.xp_until_next_level(user_data['experience'], user_data['level'])}",
                 inline=False,
             )
 
@@ -92,9 +85,7 @@ class Leaderboard(commands.Cog):
             server_position_embed.title = "**Rank**"
             server_position_embed.description = "**That rank position does not exist!**"
 
-        await ctx.reply(embed=server_position_embed)
-
-        cur.close()
+        await self.bot.rest_scheduler.reply(ctx, embed=server_position_embed)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,8 +1,10 @@
 import discord
 from discord.ext import commands
 
-from easy_pil import Canvas, Editor, Font, Text, load_image_async
-from typing import Union
+import io
+from typing import Dict, Union
+
+from utils.errors import RankCardRendererBusy
 
 
 class Rank(commands.Cog):
@@ -11,6 +13,45 @@ class Rank(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def reply_busy(self, ctx: commands.Context, rank_embed: discord.Embed) -> None:
+        """Let the user know that rank cards can't be rendered right now."""
+
+        rank_embed.description = (
+            "**Lots of rank cards are being made right now, please try again in a moment!**"
+        )
+        await self.bot.rest_scheduler.reply(ctx, embed=rank_embed)
+
+    async def get_rank_card(
+        self, member: discord.Member, user_data: Dict[str, Union[str, int, float]]
+    ) -> bytes:
+        """Return the PNG bytes of a member's rank card, only rendering it if its visible state changed."""
+
+        # The key holds exactly what is drawn on the card, the percentage is derived from the XP values
+        card_key = (
+            user_data["name"],
+            member.display_avatar.key,
+            user_data["xp"],
+            user_data["next_level_xp"],
+            user_data["level"],
+            user_data["rank"],
+        )
+
+        card_bytes = self.bot.rank_card_cache.get(card_key)
+
+        if card_bytes is not None:
+            return card_bytes
+
+        # Fail fast before downloading anything if the renderer can't take more work
+        if self.bot.rank_card_renderer.is_full():
+            raise RankCardRendererBusy("The rank card render queue is full.")
+
+        avatar_bytes = await self.bot.avatar_cache.get(member.display_avatar)
+        card_bytes = await self.bot.rank_card_renderer.render(user_data, avatar_bytes)
+
+        self.bot.rank_card_cache.put(card_key, card_bytes)
+
+        return card_bytes
+
     @commands.hybrid_command(name="rank", aliases=["level"])
     @commands.guild_only()
     async def rank(
@@ -21,99 +62,52 @@ class Rank(commands.Cog):
         if not member:
             member = ctx.author
 
-        cur = self.bot.db.cursor()
-
-        res = cur.execute(
-            "SELECT user_id, experience, level FROM level WHERE guild_id=? ORDER BY experience DESC",
-            (ctx.guild.id,),
-        ).fetchall()
-
-        if len(res) > 0:
-            member_found = False
-            member_rank_position = 1
-            member_level_obj = None
+        rank_embed = discord.Embed(
+            colour=discord.Colour.from_str("#02f4fd"),
+        )
 
-            rank_embed = discord.Embed(
-                colour=discord.Colour.from_str("#02f4fd"),
-            )
-
-            for user in res:
-                if user[0] == member.id:
-                    member_found = True
-                    member_level_obj = user
-                    break
-                else:
-                    member_rank_position += 1
+        member_level_obj = await self.bot.level_store.get(member.id, ctx.guild.id)
+        member_found = member_level_obj is not None
 
+        if await self.bot.level_store.guild_size(ctx.guild.id) > 0:
             if member_found:
-                experience_for_next_level = round(
-                    ((member_level_obj[2] + 1) ** (1 / 0.55)) * 62
+                member_rank_position = await self.bot.level_store.rank_of(
+                    ctx.guild.id, member.id
+                )
+
+                experience_for_next_level = self.bot.level_curve.xp_for_level(
+                    member_level_obj["level"] + 1
                 )
 
                 user_data = {
                     "name": member.name,
-                    "xp": member_level_obj[1],
+                    "xp": member_level_obj["experience"],
                     "next_level_xp": experience_for_next_level,
-                    "level": member_level_obj[2],
-                    "percentage": (member_level_obj[1] / experience_for_next_level)
+                    "level": member_level_obj["level"],
+                    "percentage": (
+                        member_level_obj["experience"] / experience_for_next_level
+                    )
                     * 100,
                     "rank": member_rank_position,
                 }
 
-                background = Editor(Canvas((900, 300), color="#23272A"))
-                profile_image = await load_image_async(member.display_avatar.url)
-                profile = Editor(profile_image).resize((190, 190)).circle_image()
-
-                poppins = Font.poppins(size=30)
-
-                background.rectangle((20, 20), 894, 260, "#2a2e35")
-                background.paste(profile, (50, 50))
-                background.ellipse(
-                    (42, 42), width=206, height=206, outline="#43b581", stroke_width=10
-                )
-                background.rectangle(
-                    (260, 180), width=630, height=40, fill="#484b4e", radius=20
-                )
-                background.bar(
-                    (260, 180),
-                    max_width=630,
-                    height=40,
-                    percentage=user_data["percentage"],
-                    fill="#00fa81",
-                    radius=20,
-                )
-                background.text(
-                    (270, 120), user_data["name"], font=poppins, color="#00fa81"
-                )
-                background.text(
-                    (870, 125),
-                    f"{user_data['xp']} / {user_data['next_level_xp']}",
-                    font=poppins,
-                    color="#00fa81",
-                    align="right",
-                )
-
-                rank_level_texts = [
-                    Text("Rank ", color="#00fa81", font=poppins),
-                    Text(f"{user_data['rank']}", color="#1EAAFF", font=poppins),
-                    Text("   Level ", color="#00fa81", font=poppins),
-                    Text(f"{user_data['level']}", color="#1EAAFF", font=poppins),
-                ]
+                try:
+                    card_bytes = await self.get_rank_card(member, user_data)
 
-                background.multi_text((850, 50), texts=rank_level_texts, align="right")
+                except RankCardRendererBusy:
+                    await self.reply_busy(ctx, rank_embed)
+                    return
 
-                file = discord.File(fp=background.image_bytes, filename="rank.png")
-                await ctx.reply(file=file)
+                file = discord.File(fp=io.BytesIO(card_bytes), filename="rank.png")
+                await self.bot.rest_scheduler.reply(ctx, file=file)
 
             else:
                 rank_embed.description = "**This user does not have any level data!**"
-                await ctx.reply(embed=rank_embed)
+                await self.bot.rest_scheduler.reply(ctx, embed=rank_embed)
 
         else:
             rank_embed.description = "**This server does not have any level data!**"
-            await ctx.reply(embed=rank_embed)
-
-        cur.close()
+            await self.bot.rest_scheduler.reply(ctx, embed=rank_embed)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -25,7 +25,8 @@ class Banner(commands.Cog):
         """Display a user's banner."""
 
         user = ctx.author if (not user) else user
-        user = await self.bot.fetch_user(user.id)
+        # Only fetched profiles include the banner, so the gateway cache can't be used here
+        user = await self.bot.user_cache.fetch_user(user.id)
 
         banner_embed = discord.Embed(
             colour=discord.Colour.from_str("#8308f7"),
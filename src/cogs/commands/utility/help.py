@@ -381,7 +381,15 @@ class HelpView(discord.ui.View):
             title="Admin",
         )
 
-        command_list = ["sync", "reload", "shutdown"]
+        command_list = [
+            "sync",
+            "reload",
+            "shutdown",
+            "level_stats",
+            "relevel",
+            "search_logs",
+            "metrics",
+        ]
         description_text = "Use `$help <command>` for more info.\n```"
 
         for command in command_list:
@@ -1,6 +1,8 @@
 import discord
 from discord.ext import commands
 
+from utils.rest_scheduler import Priority
+
 
 class OnMemberJoin(commands.Cog):
     """A cog that handles member join events and related functions."""
@@ -20,7 +22,11 @@ class OnMemberJoin(commands.Cog):
                 funtimes_guild.get_role(856417327188148246),
                 funtimes_guild.get_role(856417327188148251),
             ]
-            await member.add_roles(*role_categories)
+            await self.bot.rest_scheduler.submit(
+                Priority.ROLES,
+                ("guild", member.guild.id),
+                lambda: member.add_roles(*role_categories),
+            )
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import logging
 import time
@@ -7,6 +7,11 @@ import sqlite3
 import random
 from typing import Dict, Union
 
+from utils.cooldown_index import CooldownIndex
+from utils.level_store import new_user_data
+from utils.level_up_announcer import LevelUpAnnouncer
+from utils.xp_ingest import XPEvent, XPIngestQueue
+
 logger = logging.getLogger("discord")
 
 
@@ -15,49 +20,52 @@ class OnMessage(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-
-    async def get_user_data(
-        self, message: discord.Message
-    ) -> Dict[str, Union[int, float]]:
+        self.cooldown_index = CooldownIndex(cooldown=30)
+        self.xp_ingest_queue = XPIngestQueue(
+            self.process_xp_event,
+            worker_count=bot.config.xp_workers,
+            max_size=bot.config.xp_queue_size,
+            overflow_policy=bot.config.xp_overflow_policy,
+        )
+        self.level_up_announcer = LevelUpAnnouncer(
+            bot, flush_interval=bot.config.level_up_flush_interval
+        )
+
+    async def cog_load(self) -> None:
+        self.xp_ingest_queue.start()
+        self.flush_level_buffer.start()
+
+    async def cog_unload(self) -> None:
+        # Make sure no queued or buffered XP is lost when the cog is unloaded or the bot closes
+        await self.xp_ingest_queue.stop()
+        await self.level_up_announcer.close()
+
+        self.flush_level_buffer.cancel()
+        flushed_rows = await self.bot.level_store.flush()
+
+        logger.info("Flushed %s buffered level rows on unload.", flushed_rows)
+
+    @tasks.loop(seconds=10)
+    async def flush_level_buffer(self) -> None:
+        """Periodically write the buffered level rows to the database."""
+
+        self.cooldown_index.evict_expired(time.time())
+        await self.bot.level_store.flush()
+
+    async def get_user_data(self, event: XPEvent) -> Dict[str, Union[int, float]]:
         """Return a dict representing the level table data of a user."""
 
-        user_data = {
-            "user_id": message.author.id,
-            "guild_id": message.guild.id,
-        }
-
-        cur = self.bot.db.cursor()
-
-        # Check if user exists in db, add them if not
+        # New users are only inserted once their XP changes
         try:
-            res = cur.execute(
-                "SELECT * from level WHERE user_id = ? AND guild_id = ?",
-                (message.author.id, message.guild.id),
-            ).fetchone()
-
-            if not res:
-                # Add user to level table
-                cur.execute(
-                    "INSERT INTO level (user_id, guild_id) VALUES (?, ?)",
-                    (message.author.id, message.guild.id),
-                )
-                self.bot.db.commit()
-
-                user_data["experience"] = 0
-                user_data["level"] = 1
-                user_data["previous_message_timestamp"] = 0
+            user_data = await self.bot.level_store.get(event.user_id, event.guild_id)
 
-            else:
-                user_data["experience"] = res[2]
-                user_data["level"] = res[3]
-                user_data["previous_message_timestamp"] = res[4]
-
-            cur.close()
+            if user_data:
+                return user_data
 
         except sqlite3.Error as e:
-            logger.error("Error fetching/adding user data: %s", e)
+            logger.error("Error fetching user data: %s", e)
 
-        return user_data
+        return new_user_data(event.user_id, event.guild_id)
 
     async def update_user_experience(
         self, user_data: dict[str, Union[int, float]], current_time: float
@@ -65,7 +73,10 @@ class OnMessage(commands.Cog):
         """Give a random amount of XP to a user."""
 
         # Only allow a user to get XP once every 30 secs
-        if current_time - user_data["previous_message_timestamp"] >= 30:
+        if (
+            current_time - user_data["previous_message_timestamp"]
+            >= self.cooldown_index.cooldown
+        ):
             random_xp_amount = random.randint(15, 25)
 
             user_data["experience"] += random_xp_amount
@@ -74,46 +85,50 @@ class OnMessage(commands.Cog):
         return user_data
 
     async def update_user_level(
-        self, message: discord.Message, user_data: dict[str, Union[int, float]]
+        self, event: XPEvent, user_data: dict[str, Union[int, float]]
     ) -> dict[str, Union[int, float]]:
         """Calculate and update the level of a user."""
 
         currently_stored_level = user_data["level"]
-        calculated_level = int((user_data["experience"] // 62) ** 0.55) + 1
+        calculated_level = self.bot.level_curve.level_for_xp(user_data["experience"])
 
         if calculated_level > currently_stored_level:
             user_data["level"] = calculated_level
 
+            # Level ups are batched per channel instead of being sent one by one
             if self.bot.platform == "Linux":
-                await message.channel.send(
-                    f"**{message.author.mention} Has Reached Level {calculated_level}!**"
+                self.level_up_announcer.announce(
+                    event.channel_id, event.user_id, calculated_level
                 )
 
         return user_data
 
     async def update_database(self, user_data: dict[str, Union[int, float]]) -> None:
-        """Store the updated user data object in the database."""
+        """Queue the updated user data object to be written to the database."""
 
-        cur = self.bot.db.cursor()
+        await self.bot.level_store.upsert(user_data)
 
-        try:
-            cur.execute(
-                "UPDATE level SET experience=?, level=?, previous_message_timestamp=? WHERE user_id=? AND guild_id=?",
-                (
-                    user_data["experience"],
-                    user_data["level"],
-                    user_data["previous_message_timestamp"],
-                    user_data["user_id"],
-                    user_data["guild_id"],
-                ),
-            )
+    async def process_xp_event(self, event: XPEvent) -> None:
+        """Give XP for a queued message event. Ran by the XP ingest workers."""
 
-            self.bot.db.commit()
+        # The member may have been given XP while this event was queued
+        if self.cooldown_index.is_on_cooldown(
+            event.guild_id, event.user_id, event.timestamp
+        ):
+            return
 
-        except sqlite3.Error as e:
-            logger.error("Error fetching/adding user data: %s", e)
+        user_data = await self.get_user_data(event)
+        previous_experience = user_data["experience"]
+
+        user_data = await self.update_user_experience(user_data, event.timestamp)
+        self.cooldown_index.start(
+            event.guild_id, event.user_id, user_data["previous_message_timestamp"]
+        )
 
-        cur.close()
+        # Only write rows whose XP actually changed
+        if user_data["experience"] != previous_experience:
+            user_data = await self.update_user_level(event, user_data)
+            await self.update_database(user_data)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
@@ -123,10 +138,18 @@ class OnMessage(commands.Cog):
 
         # Only respond to messages from guilds and non-bot users
         if (message.channel.type != "private") and (not message.author.bot):
-            user_data = await self.get_user_data(message)
-            user_data = await self.update_user_experience(user_data, current_time)
-            user_data = await self.update_user_level(message, user_data)
-            await self.update_database(user_data)
+            # Messages sent during the XP cooldown never need to be queued
+            if self.cooldown_index.is_on_cooldown(
+                message.guild.id, message.author.id, current_time
+            ):
+                return
+
+            # Everything else happens on the XP workers, so dispatch never waits on it
+            self.xp_ingest_queue.submit(
+                XPEvent(
+                    message.guild.id, message.author.id, message.channel.id, current_time
+                )
+            )
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -2,7 +2,9 @@ import discord
 from discord.ext import commands
 
 import logging
-from typing import Dict
+from typing import Awaitable, Callable, Dict
+
+from utils.rest_scheduler import Priority
 
 logger = logging.getLogger("discord")
 
@@ -103,6 +105,15 @@ class OnReaction(commands.Cog):
 
         self.cached = True
 
+    async def edit_roles(
+        self, edit: Callable[[], Awaitable[None]], member: discord.Member
+    ) -> None:
+        """Send a role change through the REST scheduler so it never holds up command replies."""
+
+        await self.bot.rest_scheduler.submit(
+            Priority.ROLES, ("guild", member.guild.id), edit
+        )
+
     async def manage_roles(
         self,
         member: discord.Member,
@@ -114,7 +125,7 @@ class OnReaction(commands.Cog):
 
         # Add new role to member
         role_to_add = self.funtimes_guild.get_role(emoji_role_dict[emoji_id])
-        await member.add_roles(role_to_add)
+        await self.edit_roles(lambda: member.add_roles(role_to_add), member)
         self.message_reactioners[message_id][emoji_id].add(member.id)
 
         # Remove any colour roles the member already had before prior to this new role
@@ -123,7 +134,9 @@ class OnReaction(commands.Cog):
             for role in member.roles
             if role.id in emoji_role_dict.values() and role.id != role_to_add.id
         ]
-        await member.remove_roles(*curr_member_colour_roles)
+        await self.edit_roles(
+            lambda: member.remove_roles(*curr_member_colour_roles), member
+        )
 
         # Remove member from active list of members who selected a role (on prior roles)
         message = await self.roles_channel.fetch_message(message_id)
@@ -139,7 +152,11 @@ class OnReaction(commands.Cog):
             if (curr_emoji_id != emoji_id) and (
                 member.id in self.message_reactioners[message_id][curr_emoji_id]
             ):
-                await curr_reaction.remove(member)
+                await self.bot.rest_scheduler.submit(
+                    Priority.ROLES,
+                    ("channel", self.roles_channel.id),
+                    lambda: curr_reaction.remove(member),
+                )
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(
@@ -156,7 +173,7 @@ class OnReaction(commands.Cog):
 
             # Handle member accepting TOS message
             if payload.message_id == 985917177850908742 and payload.emoji.name == "✅":
-                await member.add_roles(self.tos["role"])
+                await self.edit_roles(lambda: member.add_roles(self.tos["role"]), member)
 
             # Handle member selecting a colour/location/gender/age role
             elif payload.message_id in self.message_to_emoji_dict:
@@ -180,14 +197,14 @@ class OnReaction(commands.Cog):
 
             # Handle member accepting TOS message
             if payload.message_id == 985917177850908742 and payload.emoji.name == "✅":
-                await member.add_roles(self.tos["role"])
+                await self.edit_roles(lambda: member.add_roles(self.tos["role"]), member)
 
             # Handle member selecting a colour/location/gender/age role
             elif payload.message_id in self.message_to_emoji_dict:
                 role = self.funtimes_guild.get_role(
                     self.message_to_emoji_dict[payload.message_id][payload.emoji.id]
                 )
-                await member.remove_roles(role)
+                await self.edit_roles(lambda: member.remove_roles(role), member)
                 self.message_reactioners[payload.message_id][payload.emoji.id].remove(
                     member.id
                 )
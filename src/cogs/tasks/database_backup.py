@@ -0,0 +1,130 @@
+from discord.ext import commands, tasks
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from utils.backup_verification import log_verification, verify_backup_in_worker
+from utils.database_backup import backup_database, get_backup_date, get_latest_backup
+from utils.incremental_backup import restore_changes, take_changes, write_delta
+
+logger = logging.getLogger("discord")
+
+
+class DatabaseBackup(commands.Cog):
+    """Cog for periodically backing up the database while the bot keeps running."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        # Keeps an incremental backup from being written while a new full backup replaces its base
+        self.backup_lock = asyncio.Lock()
+
+    async def cog_load(self) -> None:
+        # Every cluster shares one database file, so only one of them backs it up
+        if self.bot.is_primary_cluster:
+            self.run_delta_backup.change_interval(
+                minutes=self.bot.config.backup_delta_interval_minutes
+            )
+            self.run_backup.start()
+            self.run_delta_backup.start()
+
+    async def cog_unload(self) -> None:
+        self.run_backup.cancel()
+        self.run_delta_backup.cancel()
+
+    def is_full_backup_due(self) -> bool:
+        """Whether the newest full backup is older than the full backup interval."""
+
+        latest_backup = get_latest_backup(self.bot.config.dir_paths["backups"])
+
+        if latest_backup is None:
+            return True
+
+        backup_date = get_backup_date(os.path.basename(latest_backup))
+        interval = timedelta(hours=self.bot.config.backup_interval_hours)
+
+        return datetime.now() - backup_date >= interval
+
+    @tasks.loop(hours=1)
+    async def run_backup(self) -> None:
+        """Take a full backup on a worker thread once the newest one is old enough."""
+
+        async with self.backup_lock:
+            if not self.is_full_backup_due():
+                return
+
+            # Changes so far go onto the previous full backup, so none are lost if this one fails.
+            # The changelog isn't cleared, as replaying rows the new backup already holds is harmless
+            await self.write_delta_backup()
+
+            try:
+                report = await asyncio.to_thread(
+                    backup_database,
+                    self.bot.db.db_path,
+                    self.bot.config.dir_paths["backups"],
+                    self.bot.config.backup_retention_days,
+                )
+
+            except (sqlite3.Error, OSError) as e:
+                logger.error("Error backing up database: %s", e)
+                return
+
+        # Verifying only reads the backup, so incremental backups don't need to wait for it
+        try:
+            log_verification(await verify_backup_in_worker(report.path))
+
+        except (sqlite3.Error, OSError, BrokenProcessPool) as e:
+            logger.error("Error verifying backup: %s", e)
+
+    @tasks.loop(minutes=15)
+    async def run_delta_backup(self) -> None:
+        """Write the level rows changed since the last backup as an incremental backup."""
+
+        async with self.backup_lock:
+            await self.write_delta_backup()
+
+    async def write_delta_backup(self) -> None:
+        """Move the changelog into an incremental backup on the newest full backup. Callers hold backup_lock."""
+
+        backup_path = get_latest_backup(self.bot.config.dir_paths["backups"])
+
+        # Changes keep piling up in the changelog until there is a full backup to put them on
+        if backup_path is None:
+            return
+
+        start_time = time.perf_counter()
+
+        try:
+            changed_rows = await self.bot.db.run_write(take_changes)
+
+        except sqlite3.Error as e:
+            logger.error("Error reading changes for incremental backup: %s", e)
+            return
+
+        if not changed_rows:
+            return
+
+        try:
+            delta_path = await asyncio.to_thread(write_delta, backup_path, changed_rows)
+
+        except OSError as e:
+            logger.error("Error writing incremental backup: %s", e)
+
+            # Mark the rows as changed again so the next incremental backup includes them
+            await self.bot.db.run_write(lambda db: restore_changes(db, changed_rows))
+            return
+
+        logger.info(
+            "Incremental backup written to: %s (%s rows in %.2fs)",
+            delta_path,
+            len(changed_rows),
+            time.perf_counter() - start_time,
+        )
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(DatabaseBackup(bot))
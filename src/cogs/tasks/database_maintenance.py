@@ -0,0 +1,40 @@
+from discord.ext import commands, tasks
+
+import logging
+import sqlite3
+
+from utils.database_maintenance import maintain_database
+
+logger = logging.getLogger("discord")
+
+
+class DatabaseMaintenance(commands.Cog):
+    """Cog for periodically checkpointing, optimizing and vacuuming the database."""
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+
+    async def cog_load(self) -> None:
+        # Every cluster shares one database file, so only one of them maintains it
+        if self.bot.is_primary_cluster:
+            self.run_maintenance.change_interval(
+                hours=self.bot.config.db_maintenance_interval_hours
+            )
+            self.run_maintenance.start()
+
+    async def cog_unload(self) -> None:
+        self.run_maintenance.cancel()
+
+    @tasks.loop(hours=6)
+    async def run_maintenance(self) -> None:
+        """Run the database maintenance steps off of the event loop."""
+
+        try:
+            await maintain_database(self.bot.db)
+
+        except sqlite3.Error as e:
+            logger.error("Error running database maintenance: %s", e)
+
+
+async def setup(bot: commands.Bot) -> None:
+    await bot.add_cog(DatabaseMaintenance(bot))
@@ -0,0 +1,56 @@
+import argparse
+import os
+from datetime import datetime
+
+from utils.log_archive import LogQuery, index_archives, search_logs
+
+
+def parse_date(value: str):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Search the archived logs, only decompressing the days whose index may hold a match."
+    )
+    parser.add_argument("--logs-dir", default=os.path.join("..", "storage", "logs"))
+    parser.add_argument(
+        "--prefix",
+        help='Only search the logs of one cluster, e.g. "cluster-0-". Searches every cluster by default',
+    )
+    parser.add_argument("--level", action="append", default=[], type=str.upper)
+    parser.add_argument("--function", action="append", default=[])
+    parser.add_argument("--user-id", action="append", default=[], type=int)
+    parser.add_argument("--guild-id", action="append", default=[], type=int)
+    parser.add_argument("--text", help="Case insensitive text the record must contain")
+    parser.add_argument("--since", type=parse_date, help="YYYY-MM-DD")
+    parser.add_argument("--until", type=parse_date, help="YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Index the archives that have no index yet, e.g. ones rotated before indexing existed",
+    )
+    args = parser.parse_args()
+
+    if args.index:
+        indexed_archives = index_archives(args.logs_dir, args.prefix)
+        print(f"Indexed {len(indexed_archives)} archives.")
+
+    query = LogQuery(
+        levels=frozenset(args.level),
+        functions=frozenset(args.function),
+        user_ids=frozenset(args.user_id),
+        guild_ids=frozenset(args.guild_id),
+        text=args.text,
+        since=args.since,
+        until=args.until,
+    )
+    result = search_logs(args.logs_dir, query, args.prefix, args.limit)
+
+    for log_file, record in result.records:
+        print(f"{log_file}: {record}", end="")
+
+    print(
+        f"\nFound {len(result.records)} records in {result.scanned_files} of {result.log_files} log files in {result.duration:.2f}s."
+    )
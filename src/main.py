@@ -7,12 +7,22 @@ import os
 import json
 import platform
 import logging
-from logging.handlers import TimedRotatingFileHandler
-import zipfile
 import time
 import sqlite3
 
+from utils.avatar_cache import AvatarCache
+from utils.byte_lru_cache import ByteLRUCache
+from utils.database import STORAGE_PROFILES, Database
 from utils.extension_paths import get_extension_paths
+from utils.leaderboard_engine import LeaderboardEngine
+from utils.level_curve import LevelCurve
+from utils.level_store import SQLiteLevelStore
+from utils.log_pipeline import ArchivingFileHandler, start_queue_logging
+from utils.metrics import Metrics, MetricsServer
+from utils.migrations import migrate
+from utils.rank_card import RankCardRenderer
+from utils.rest_scheduler import RestScheduler
+from utils.user_cache import UserCache
 
 
 load_dotenv()
@@ -23,8 +33,9 @@ logger = logging.getLogger("discord")
 class Config:
     """Class to hold all the bot variables and setup methods."""
 
-    def __init__(self):
+    def __init__(self, log_prefix=""):
         self.dir_paths = {}
+        self.log_prefix = log_prefix
 
     def setup(self):
         """Run the basic setup flow for this class."""
@@ -40,12 +51,14 @@ class Config:
         self.dir_paths["storage"] = os.path.join("..", "storage")
         self.dir_paths["logs"] = os.path.join(self.dir_paths["storage"], "logs")
         self.dir_paths["banners"] = os.path.join(self.dir_paths["storage"], "banners")
+        self.dir_paths["avatars"] = os.path.join(self.dir_paths["storage"], "avatars")
+        self.dir_paths["backups"] = os.path.join(self.dir_paths["storage"], "backups")
 
         for _, curr_path in self.dir_paths.items():
             os.makedirs(curr_path, exist_ok=True)
 
     def setup_logger(self):
-        """Setup a TimedRotatingFileHandler that rotates at midnight and formats filenames dynamically."""
+        """Setup a midnight rotating log file that is written & archived off of the event loop."""
 
         # Configure formatter
         formatter = logging.Formatter(
@@ -54,36 +67,12 @@ class Config:
         )
 
         # Configure handler
-        def rotator(source, dest):
-            # Rotated log file is zipped and the original log file will be deleted
-            zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED).write(
-                source, os.path.basename(source)
-            )
-            os.remove(source)
-
-        handler = TimedRotatingFileHandler(
-            os.path.join(self.dir_paths["logs"], "current.log"),
-            when="midnight",
-            backupCount=365,
-        )
-        """
-		default name for a log file that is being rotated (handler.namer lambda callable receives this):
-		"current.log.2024-07-19"
-
-		custom name for log file that is being rotated (lambda callable of handler.namer sets this):
-		"2024-07-18.zip"
-		"""
-        handler.namer = lambda name: (
-            os.path.join(self.dir_paths["logs"], f"{os.path.splitext(name)[1][1:]}.zip")
-            if name.count(".") > 1
-            else name
-        )
-        handler.rotator = rotator
+        handler = ArchivingFileHandler(self.dir_paths["logs"], self.log_prefix)
         handler.setFormatter(formatter)
 
         # Configure logger
         logger.setLevel(logging.INFO)
-        logger.addHandler(handler)
+        start_queue_logging(logger, handler)
 
     def setup_env_vars(self):
         """Read values from the .env that are to be stored within the bot."""
@@ -93,6 +82,26 @@ class Config:
         self.testing_guild = discord.Object(id=int(self.testing_guild_id))
         self.invite_link_guild = os.getenv("INVITE_LINK_GUILD")
         self.invite_link_bot = os.getenv("INVITE_LINK_BOT")
+        self.rank_card_workers = int(os.getenv("RANK_CARD_WORKERS", "2"))
+        self.rank_card_queue_size = int(os.getenv("RANK_CARD_QUEUE_SIZE", "16"))
+        self.max_level = int(os.getenv("MAX_LEVEL", "1000"))
+        self.xp_workers = int(os.getenv("XP_WORKERS", "4"))
+        self.xp_queue_size = int(os.getenv("XP_QUEUE_SIZE", "10000"))
+        self.xp_overflow_policy = os.getenv("XP_OVERFLOW_POLICY", "drop_newest")
+        self.level_up_flush_interval = float(os.getenv("LEVEL_UP_FLUSH_INTERVAL", "3"))
+        self.rest_max_concurrency = int(os.getenv("REST_MAX_CONCURRENCY", "4"))
+        self.rest_max_backlog = int(os.getenv("REST_MAX_BACKLOG", "1000"))
+        self.storage_profile = os.getenv("STORAGE_PROFILE", "balanced")
+        self.db_maintenance_interval_hours = float(
+            os.getenv("DB_MAINTENANCE_INTERVAL_HOURS", "6")
+        )
+        self.backup_interval_hours = float(os.getenv("BACKUP_INTERVAL_HOURS", "168"))
+        self.backup_delta_interval_minutes = float(
+            os.getenv("BACKUP_DELTA_INTERVAL_MINUTES", "15")
+        )
+        self.backup_retention_days = int(os.getenv("BACKUP_RETENTION_DAYS", "14"))
+        self.metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.metrics_port = int(os.getenv("METRICS_PORT", "9100"))
 
 
 class MyClient(commands.Bot):
@@ -105,6 +114,46 @@ class MyClient(commands.Bot):
         super().__init__(*args, **kwargs)
         self.start_time = time.time()
         self.platform = platform.system()
+        self.user_cache = UserCache(self)
+
+        # Only set when running as one cluster of a multi-process launch (see cluster.py)
+        self.cluster_ipc = None
+
+        # Every command is timed by the hooks and every listener by add_listener
+        self.metrics = Metrics()
+        self.before_invoke(self.metrics.before_command)
+        self.after_invoke(self.metrics.after_command)
+        self.add_listener(self.metrics.on_command_error, "on_command_error")
+
+    def add_listener(self, func, name=discord.utils.MISSING):
+        """Add a listener wrapped in the metrics of its event."""
+
+        name = func.__name__ if name is discord.utils.MISSING else name
+
+        super().add_listener(self.metrics.wrap_listener(name, func), name)
+
+    def remove_listener(self, func, name=discord.utils.MISSING):
+        """Remove a listener that was wrapped by add_listener, e.g. when a cog is reloaded."""
+
+        name = func.__name__ if name is discord.utils.MISSING else name
+
+        for listener in self.extra_events.get(name, []):
+            if getattr(listener, "__wrapped__", None) == func:
+                func = listener
+                break
+
+        super().remove_listener(func, name)
+
+    @property
+    def is_primary_cluster(self):
+        """Whether this process should run the work that only one process may do, e.g. backups."""
+
+        return self.cluster_ipc is None or self.cluster_ipc.cluster_id == 0
+
+    def owns_guild(self, guild_id):
+        """Whether the guild is handled by this process."""
+
+        return True
 
     def load_config(self):
         """Create a config obj that will store the bot variables."""
@@ -114,7 +163,7 @@ class MyClient(commands.Bot):
 
         self.config = config_obj
 
-    def load_database(self):
+    async def load_database(self):
         """Load an instance of a database into the bot."""
 
         DB_PATH = os.path.join(self.config.dir_paths["storage"], "funtimes.db")
@@ -125,35 +174,29 @@ class MyClient(commands.Bot):
         else:
             logger.info("No database was found. A new one will be created.")
 
-        db = sqlite3.connect(DB_PATH)
-
-        # Create tables if they don't exist
-        cursor = db.cursor()
+        db = Database(
+            DB_PATH, storage_profile=STORAGE_PROFILES[self.config.storage_profile]
+        )
+        await db.connect()
 
+        # Bring existing & new databases up to the latest schema
         try:
-            logger.info("Attempting to setup tables.")
-
-            cursor.execute(
-                """
-				CREATE TABLE IF NOT EXISTS level (
-					user_id BIGINT,
-					guild_id BIGINT,
-					experience INTEGER DEFAULT 0,
-					level INTEGER DEFAULT 1,
-                    previous_message_timestamp REAL DEFAULT 0,
-					PRIMARY KEY (user_id, guild_id)
-				)
-				"""
-            )
-            logger.info("Level table has been setup.")
+            logger.info("Attempting to migrate the database schema.")
+            await migrate(db)
 
         except sqlite3.Error as e:
-            logger.critical("Error creating table: %s", e)
-
-        cursor.close()
+            logger.critical("Error migrating database schema: %s", e)
 
         self.db = db
 
+        # Leaderboard & rank commands are answered from memory instead of the level table
+        self.leaderboard_engine = LeaderboardEngine(
+            guild_filter=self.owns_guild if self.cluster_ipc else None
+        )
+        await self.leaderboard_engine.load(db)
+
+        self.level_store = SQLiteLevelStore(db, self.leaderboard_engine)
+
     async def load_extensions(self):
         """Load all of the initial extensions into the bot."""
 
@@ -188,12 +231,68 @@ class MyClient(commands.Bot):
         self.load_config()
         logger.info("Config values have been loaded into the bot.")
 
-        self.load_database()
+        self.rest_scheduler = RestScheduler(
+            max_concurrency=self.config.rest_max_concurrency,
+            max_backlog=self.config.rest_max_backlog,
+        )
+        logger.info("REST scheduler has been setup.")
+
+        self.level_curve = LevelCurve(self.config.max_level)
+        logger.info("Level curve has been precomputed.")
+
+        await self.load_database()
         logger.info("Database has been setup.")
 
+        self.rank_card_renderer = RankCardRenderer(
+            concurrency=self.config.rank_card_workers,
+            max_queued=self.config.rank_card_queue_size,
+        )
+        logger.info("Rank card renderer has been setup.")
+
+        self.avatar_cache = AvatarCache(self.config.dir_paths["avatars"])
+        logger.info("Avatar cache has been setup.")
+
+        # Scanning the avatar directory takes longer the more avatars are cached
+        await asyncio.to_thread(self.avatar_cache.prune_disk_cache)
+        logger.info("Stale avatars have been pruned from the disk cache.")
+
+        # Rendered cards are reused until something drawn on them changes
+        self.rank_card_cache = ByteLRUCache(max_bytes=16 * 1024 * 1024)
+        logger.info("Rank card cache has been setup.")
+
         await self.load_extensions()
         logger.info("Extensions have been loaded.")
 
+        if self.config.metrics_port:
+            # Every cluster serves its own metrics, on consecutive ports
+            cluster_id = self.cluster_ipc.cluster_id if self.cluster_ipc else 0
+
+            self.metrics_server = MetricsServer(
+                self.metrics,
+                self.config.metrics_host,
+                self.config.metrics_port + cluster_id,
+            )
+
+            try:
+                await self.metrics_server.start()
+
+            except OSError as e:
+                logger.error("Error starting the metrics server: %s", e)
+
+    async def close(self):
+        """Close the bot and then the database once every cog has been unloaded."""
+
+        await super().close()
+
+        if hasattr(self, "metrics_server"):
+            await self.metrics_server.close()
+
+        if hasattr(self, "rank_card_renderer"):
+            self.rank_card_renderer.close()
+
+        if hasattr(self, "db"):
+            self.db.close()
+
 
 # Setting intents
 intents = discord.Intents.default()
@@ -218,18 +317,24 @@ else:
     )
     bot_token = os.getenv("BOT_TOKEN_BETA")
 
-# Create bot instance
-bot = MyClient(
-    command_prefix=command_prefix,
-    activity=activity,
-    intents=intents,
-    case_insensitive=True,
-)
+
+def create_bot(client_class=MyClient, **kwargs):
+    """Create a bot instance with the properties of the current system-type."""
+
+    return client_class(
+        command_prefix=command_prefix,
+        activity=activity,
+        intents=intents,
+        case_insensitive=True,
+        **kwargs,
+    )
 
 
 async def main():
     """Start the bot"""
 
+    bot = create_bot()
+
     async with bot:
         await bot.start(bot_token)
 
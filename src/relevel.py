@@ -0,0 +1,43 @@
+import argparse
+import os
+import sqlite3
+
+from utils.level_curve import LevelCurve
+from utils.level_migration import RelevelReport, relevel_connection
+
+
+def print_progress(report: RelevelReport) -> None:
+    """Print how far along a relevel run is."""
+
+    print(
+        f"Scanned {report.rows_scanned} rows ({report.rows_per_second():.0f} rows/sec), {report.rows_changed} level changes so far."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute the level of every row in the level table from the current level curve."
+    )
+    parser.add_argument("--db", default=os.path.join("..", "storage", "funtimes.db"))
+    parser.add_argument("--max-level", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Write the new levels. Without this only a dry run histogram is printed.",
+    )
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.db)
+
+    report = relevel_connection(
+        db,
+        LevelCurve(args.max_level),
+        chunk_size=args.chunk_size,
+        dry_run=not args.apply,
+        progress=print_progress,
+    )
+
+    db.close()
+
+    print(report.summary())
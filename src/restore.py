@@ -0,0 +1,103 @@
+import argparse
+import logging
+import os
+import sqlite3
+import time
+
+from utils.backup_verification import log_verification, verify_backup, verify_database
+from utils.database_backup import get_latest_backup, logger
+from utils.incremental_backup import restore_backup, swap_database
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Verify a full backup, restore it with every incremental backup taken on top of it and optionally swap it in."
+    )
+    parser.add_argument(
+        "--backup-dir", default=os.path.join("..", "storage", "backups")
+    )
+    parser.add_argument(
+        "--backup", help="Full backup to restore, defaults to the newest one"
+    )
+    parser.add_argument(
+        "--output", default=os.path.join("..", "storage", "funtimes.restored.db")
+    )
+    parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="Replace --db with the restored database. Stop the bot first",
+    )
+    parser.add_argument("--db", default=os.path.join("..", "storage", "funtimes.db"))
+    parser.add_argument(
+        "--verify-only",
+        action="store_true",
+        help="Only verify the backup",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Restore even if the backup fails verification",
+    )
+    args = parser.parse_args()
+
+    backup_path = args.backup or get_latest_backup(args.backup_dir)
+
+    if backup_path is None:
+        parser.error(f"No backups found in {args.backup_dir}")
+
+    # Restored next to the database, so the swap is a rename within one filesystem
+    output_path = f"{args.db}.restored" if args.swap else args.output
+
+    # Show the restore logs in the terminal
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
+
+    timings = []
+
+    try:
+        backup_report = verify_backup(backup_path)
+        log_verification(backup_report)
+        timings.append(("Verify backup", backup_report.duration))
+
+        if args.verify_only:
+            raise SystemExit(0 if backup_report.ok else 1)
+
+        if not backup_report.ok and not args.force:
+            raise SystemExit(
+                "Backup failed verification, use --force to restore it anyway"
+            )
+
+        restore_report = restore_backup(backup_path, output_path)
+        timings.append(("Decompress", restore_report.decompress_duration))
+        timings.append(
+            (
+                f"Replay {restore_report.deltas_applied} incremental backups",
+                restore_report.replay_duration,
+            )
+        )
+
+        restored_report = verify_database(output_path)
+        log_verification(restored_report)
+        timings.append(("Verify restored database", restored_report.duration))
+
+        if not restored_report.ok:
+            raise SystemExit(
+                f"Restored database failed verification, kept at {output_path}"
+            )
+
+        if args.swap:
+            start_time = time.perf_counter()
+            previous_path = swap_database(output_path, args.db)
+            timings.append(("Swap", time.perf_counter() - start_time))
+
+            print(
+                f"Swapped the restored database into {args.db}, previous one kept at {previous_path}"
+            )
+
+    except (sqlite3.Error, ValueError) as e:
+        raise SystemExit(f"Error restoring backup: {e}")
+
+    for step, duration in timings:
+        print(f"{step:<40}{duration:>8.2f}s")
+
+    print(f"{'Total':<40}{sum(duration for _, duration in timings):>8.2f}s")
@@ -0,0 +1,149 @@
+import discord
+from PIL import Image
+
+import asyncio
+import io
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+from utils.byte_lru_cache import ByteLRUCache
+
+logger = logging.getLogger("discord")
+
+
+class AvatarCache:
+    """Class to cache resized avatars so rank cards don't download them again.
+
+    Avatars are keyed by their hash and stored as PNGs at the exact size the rank card draws them.
+    Lookups go through an in-memory LRU first, then a directory on disk, and only then the CDN.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        size: int = 190,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_age_days: int = 30,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_cache = ByteLRUCache(max_memory_bytes)
+        self.max_disk_age_days = max_disk_age_days
+
+        self.disk_hits = 0
+        self.network_fetches = 0
+
+    def prune_disk_cache(self) -> None:
+        """Remove avatars from disk that haven't been used in a while, like those of changed avatars.
+
+        This scans the whole directory, so it is meant to be run on a worker thread.
+        """
+
+        oldest_allowed_time = time.time() - self.max_disk_age_days * 86400
+        removed_count = 0
+
+        for entry in os.scandir(self.cache_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < oldest_allowed_time:
+                    os.remove(entry.path)
+                    removed_count += 1
+
+            # Rank cards are served while pruning, so an avatar can be replaced mid-scan
+            except FileNotFoundError:
+                continue
+
+        if removed_count:
+            logger.info("Removed %s stale avatars from the disk cache.", removed_count)
+
+    def fetch_size(self) -> int:
+        """Return the smallest size the CDN can serve that is at least as big as the avatar size."""
+
+        # The CDN only accepts powers of 2 between 16 and 4096
+        fetch_size = 16
+
+        while fetch_size < self.size and fetch_size < 4096:
+            fetch_size *= 2
+
+        return fetch_size
+
+    def read_disk(self, path: str) -> Optional[bytes]:
+        """Read a cached avatar from disk, refreshing its mtime so it isn't pruned."""
+
+        try:
+            with open(path, "rb") as file:
+                avatar_bytes = file.read()
+
+        except FileNotFoundError:
+            return None
+
+        os.utime(path)
+
+        return avatar_bytes
+
+    def resize_and_store(self, path: str, raw_bytes: bytes) -> bytes:
+        """Resize a downloaded avatar to the card size and write it to disk."""
+
+        avatar_image = Image.open(io.BytesIO(raw_bytes)).convert("RGBA")
+        avatar_image = avatar_image.resize((self.size, self.size), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        avatar_image.save(buffer, format="PNG")
+        avatar_bytes = buffer.getvalue()
+
+        # Write to a temp file first so a crash never leaves a half-written avatar behind.
+        # Each write gets its own, since concurrent fetches of the same avatar would otherwise move one another's file
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp"
+        )
+
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(avatar_bytes)
+
+        os.replace(temp_path, path)
+
+        return avatar_bytes
+
+    async def get(self, asset: discord.Asset) -> bytes:
+        """Return the PNG bytes of an avatar at the card size."""
+
+        cache_key = f"{asset.key}_{self.size}"
+
+        avatar_bytes = self.memory_cache.get(cache_key)
+
+        if avatar_bytes is not None:
+            return avatar_bytes
+
+        path = os.path.join(self.cache_dir, f"{cache_key}.png")
+        avatar_bytes = await asyncio.to_thread(self.read_disk, path)
+
+        if avatar_bytes is not None:
+            self.disk_hits += 1
+
+        else:
+            self.network_fetches += 1
+
+            raw_bytes = await (
+                asset.with_static_format("png").with_size(self.fetch_size()).read()
+            )
+            avatar_bytes = await asyncio.to_thread(
+                self.resize_and_store, path, raw_bytes
+            )
+
+        self.memory_cache.put(cache_key, avatar_bytes)
+
+        return avatar_bytes
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit counters of both cache tiers."""
+
+        memory_stats = self.memory_cache.stats()
+
+        return {
+            "memory_hits": memory_stats["hits"],
+            "disk_hits": self.disk_hits,
+            "network_fetches": self.network_fetches,
+            "memory_bytes": memory_stats["bytes"],
+        }
@@ -0,0 +1,196 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import urllib.parse
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Tuple
+
+from utils.database_backup import get_verification_path
+
+logger = logging.getLogger("discord")
+
+# Row count and SHA-256 of the rows of each table
+TableChecksums = Dict[str, Tuple[int, str]]
+
+
+class VerificationReport(NamedTuple):
+    """The outcome of verifying a backup or restored database."""
+
+    path: str
+    problems: List[str]
+    tables: TableChecksums
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def get_table_checksums(db: sqlite3.Connection) -> TableChecksums:
+    """Return the row count and a checksum of the rows of every table, read in primary key order."""
+
+    table_checksums = {}
+    tables = db.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    ).fetchall()
+
+    for (table,) in tables:
+        # table_info rows are (cid, name, type, notnull, dflt_value, pk), where pk is the position in the key
+        key_columns = sorted(
+            (column[5], column[1])
+            for column in db.execute(f'PRAGMA table_info("{table}")')
+            if column[5]
+        )
+        order_by = ", ".join(f'"{name}"' for _, name in key_columns) or "rowid"
+
+        digest = hashlib.sha256()
+        row_count = 0
+        cursor = db.execute(f'SELECT * FROM "{table}" ORDER BY {order_by}')
+
+        while rows := cursor.fetchmany(10000):
+            digest.update(repr(rows).encode())
+            row_count += len(rows)
+
+        table_checksums[table] = (row_count, digest.hexdigest())
+
+    return table_checksums
+
+
+def verify_database(db_path: str) -> VerificationReport:
+    """Run quick_check on a database file and checksum its tables."""
+
+    start_time = time.perf_counter()
+    problems = []
+    tables = {}
+
+    # Immutable, since nothing else writes to a backup and it keeps SQLite from leaving WAL files next to it
+    db_uri = "file:{}?mode=ro&immutable=1".format(
+        urllib.parse.quote(os.path.abspath(db_path))
+    )
+    db = sqlite3.connect(db_uri, uri=True)
+
+    try:
+        # quick_check skips the index content checks of integrity_check, which makes it O(N) instead of O(N log N)
+        results = [row[0] for row in db.execute("PRAGMA quick_check")]
+
+        if results != ["ok"]:
+            problems.extend(f"quick_check: {result}" for result in results)
+
+        tables = get_table_checksums(db)
+
+    except sqlite3.DatabaseError as e:
+        problems.append(f"Unreadable database: {e}")
+
+    finally:
+        db.close()
+
+    return VerificationReport(
+        db_path, problems, tables, time.perf_counter() - start_time
+    )
+
+
+def verify_backup(backup_path: str) -> VerificationReport:
+    """Verify a full backup and compare it with the checksums recorded when it was first verified.
+
+    The first successful verification records the checksums, so later ones also catch a backup that changed on disk.
+    """
+
+    start_time = time.perf_counter()
+    verification_path = get_verification_path(backup_path)
+
+    if backup_path.endswith(".gz"):
+        # Decompressed next to the backup, since the temporary directory may be too small for the database
+        file_descriptor, db_path = tempfile.mkstemp(
+            prefix=".verify-", suffix=".db", dir=os.path.dirname(backup_path)
+        )
+
+        try:
+            with gzip.open(backup_path, "rb") as backup_file, os.fdopen(
+                file_descriptor, "wb"
+            ) as db_file:
+                shutil.copyfileobj(backup_file, db_file, 1024 * 1024)
+
+            report = verify_database(db_path)
+
+        except (OSError, EOFError, zlib.error) as e:
+            report = VerificationReport(backup_path, [f"Unreadable backup: {e}"], {}, 0)
+
+        finally:
+            os.remove(db_path)
+
+    else:
+        report = verify_database(backup_path)
+
+    problems = list(report.problems)
+
+    # An unreadable backup has no checksums to compare or record
+    if not problems and os.path.exists(verification_path):
+        with open(verification_path, encoding="utf-8") as verification_file:
+            recorded_tables = json.load(verification_file)["tables"]
+
+        for table in sorted(recorded_tables.keys() | report.tables.keys()):
+            recorded = tuple(recorded_tables.get(table, ()))
+            current = report.tables.get(table, ())
+
+            if recorded != current:
+                problems.append(
+                    f"Table {table} changed since it was first verified: {recorded} != {current}"
+                )
+
+    elif not problems:
+        with open(verification_path, "w", encoding="utf-8") as verification_file:
+            json.dump(
+                {"verified_at": datetime.now().isoformat(), "tables": report.tables},
+                verification_file,
+                indent=4,
+            )
+
+    return VerificationReport(
+        backup_path, problems, report.tables, time.perf_counter() - start_time
+    )
+
+
+def log_verification(report: VerificationReport) -> None:
+    """Log the outcome of a verification."""
+
+    if report.ok:
+        logger.info(
+            "Verified %s in %.2fs: %s",
+            report.path,
+            report.duration,
+            ", ".join(
+                f"{table} ({row_count} rows)"
+                for table, (row_count, _) in report.tables.items()
+            ),
+        )
+    else:
+        logger.error(
+            "Verification of %s failed:\n%s", report.path, "\n".join(report.problems)
+        )
+
+
+async def verify_backup_in_worker(backup_path: str) -> VerificationReport:
+    """Verify a backup in a separate process, so checksumming never competes with the bot for the GIL."""
+
+    executor = ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    )
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, verify_backup, backup_path
+        )
+
+    finally:
+        # The worker exits on its own once the verification is done
+        executor.shutdown(wait=False)
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class ByteLRUCache:
+    """Class to hold byte strings in memory up to a total byte budget.
+
+    When adding a value would go over the budget, the least recently used values are evicted first.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return a cached value and mark it as recently used."""
+
+        value = self.entries.get(key)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        """Cache a value, evicting the least recently used values to make room for it."""
+
+        # A value bigger than the whole budget would just evict everything else
+        if len(value) > self.max_bytes:
+            return
+
+        previous_value = self.entries.pop(key, None)
+
+        if previous_value is not None:
+            self.current_bytes -= len(previous_value)
+
+        while self.entries and self.current_bytes + len(value) > self.max_bytes:
+            _, evicted_value = self.entries.popitem(last=False)
+            self.current_bytes -= len(evicted_value)
+
+        self.entries[key] = value
+        self.current_bytes += len(value)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit & miss counters and current size of the cache."""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import threading
+import uuid
+from multiprocessing.connection import Connection
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("discord")
+
+
+class ClusterIPC:
+    """Class for the cluster side of the IPC channel between a cluster and its supervisor.
+
+    Messages are plain dicts with an "op" key:
+    - "broadcast" (cluster -> supervisor): run a command on every cluster
+    - "execute" (supervisor -> cluster): run a registered command handler
+    - "response" (cluster -> supervisor): the result of an "execute"
+    - "aggregate" (supervisor -> cluster): every cluster's result of a "broadcast"
+    - "shutdown_all" (cluster -> supervisor) and "shutdown" (supervisor -> cluster)
+    """
+
+    def __init__(self, cluster_id: int, connection: Connection) -> None:
+        self.cluster_id = cluster_id
+        self.connection = connection
+        self.send_lock = threading.Lock()
+
+        self.handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self.pending_broadcasts: Dict[str, asyncio.Future] = {}
+        self.on_shutdown: Optional[Callable[[], Awaitable[None]]] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Start reading messages from the supervisor on a background thread."""
+
+        self.loop = asyncio.get_running_loop()
+
+        threading.Thread(
+            target=self.read_messages, name="cluster-ipc-reader", daemon=True
+        ).start()
+
+    def register(self, command: str, handler: Callable[..., Awaitable[Any]]) -> None:
+        """Register the coroutine that runs a command when it is broadcast."""
+
+        self.handlers[command] = handler
+
+    def send(self, message: Dict[str, Any]) -> None:
+        with self.send_lock:
+            self.connection.send(message)
+
+    def read_messages(self) -> None:
+        """Hand every message from the supervisor over to the event loop."""
+
+        while True:
+            try:
+                message = self.connection.recv()
+
+            except (EOFError, OSError):
+                logger.warning("Cluster %s lost its IPC connection.", self.cluster_id)
+                break
+
+            try:
+                self.loop.call_soon_threadsafe(self.handle_message, message)
+
+            # The event loop has shut down, so there is nobody left to hand messages to
+            except RuntimeError:
+                break
+
+    def handle_message(self, message: Dict[str, Any]) -> None:
+        if message["op"] == "execute":
+            asyncio.create_task(self.execute(message))
+
+        elif message["op"] == "aggregate":
+            pending_broadcast = self.pending_broadcasts.pop(message["id"], None)
+
+            if pending_broadcast and not pending_broadcast.done():
+                pending_broadcast.set_result(message["results"])
+
+        elif message["op"] == "shutdown" and self.on_shutdown:
+            asyncio.create_task(self.on_shutdown())
+
+    async def execute(self, message: Dict[str, Any]) -> None:
+        """Run a command handler and send its result back to the supervisor."""
+
+        handler = self.handlers.get(message["command"])
+
+        try:
+            if handler is None:
+                raise KeyError(f"No handler registered for '{message['command']}'")
+
+            response = {"ok": True, "result": await handler(**message["args"])}
+
+        except Exception as error:
+            logger.error(
+                "Cluster %s failed to run IPC command '%s'.",
+                self.cluster_id,
+                message["command"],
+                exc_info=error,
+            )
+            response = {"ok": False, "error": repr(error)}
+
+        self.send(
+            {
+                "op": "response",
+                "id": message["id"],
+                "cluster_id": self.cluster_id,
+                **response,
+            }
+        )
+
+    async def broadcast(
+        self, command: str, timeout: float = 30, **args: Any
+    ) -> Dict[int, Dict[str, Any]]:
+        """Run a command on every cluster, including this one, and return each cluster's response."""
+
+        request_id = uuid.uuid4().hex
+        pending_broadcast = asyncio.get_running_loop().create_future()
+        self.pending_broadcasts[request_id] = pending_broadcast
+
+        self.send(
+            {
+                "op": "broadcast",
+                "id": request_id,
+                "command": command,
+                "args": args,
+                "timeout": timeout,
+            }
+        )
+
+        try:
+            # The supervisor answers for clusters that time out, so this only guards against losing the supervisor
+            return await asyncio.wait_for(pending_broadcast, timeout + 5)
+
+        finally:
+            self.pending_broadcasts.pop(request_id, None)
+
+    def request_shutdown(self) -> None:
+        """Ask the supervisor to shut down every cluster instead of restarting this one."""
+
+        self.send({"op": "shutdown_all"})
@@ -0,0 +1,60 @@
+import heapq
+from typing import Dict, List, Tuple
+
+
+class CooldownIndex:
+    """Class to track which members are still on their XP cooldown without touching the database.
+
+    Entries are keyed by a single int packed from (guild_id, user_id) and map to the time their cooldown ends.
+    A heap of (expiry, key) pairs lets expired entries be evicted in expiry order, even when XP workers
+    finish events out of order. Restarted cooldowns leave their old pair in the heap, which is skipped on eviction.
+    """
+
+    def __init__(self, cooldown: float = 30) -> None:
+        self.cooldown = cooldown
+        self.expiries: Dict[int, float] = {}
+        self.expiry_heap: List[Tuple[float, int]] = []
+
+    @staticmethod
+    def make_key(guild_id: int, user_id: int) -> int:
+        """Pack a guild and user ID into one int. Discord snowflakes always fit into 64 bits."""
+
+        return (guild_id << 64) | user_id
+
+    def is_on_cooldown(self, guild_id: int, user_id: int, current_time: float) -> bool:
+        """Check if a member is still on cooldown at the given time."""
+
+        expiry = self.expiries.get(self.make_key(guild_id, user_id))
+
+        return expiry is not None and current_time < expiry
+
+    def start(self, guild_id: int, user_id: int, rewarded_at: float) -> None:
+        """Start a member's cooldown from the time they were last given XP."""
+
+        key = self.make_key(guild_id, user_id)
+        expiry = rewarded_at + self.cooldown
+
+        # A late event never shortens a cooldown that a newer reward already started
+        if expiry <= self.expiries.get(key, 0):
+            return
+
+        self.expiries[key] = expiry
+        heapq.heappush(self.expiry_heap, (expiry, key))
+
+    def evict_expired(self, current_time: float) -> int:
+        """Remove every entry whose cooldown has ended and return how many were removed."""
+
+        evicted_count = 0
+
+        while self.expiry_heap and self.expiry_heap[0][0] <= current_time:
+            expiry, key = heapq.heappop(self.expiry_heap)
+
+            # Skip the pairs of cooldowns that were restarted since
+            if self.expiries.get(key) == expiry:
+                del self.expiries[key]
+                evicted_count += 1
+
+        return evicted_count
+
+    def __len__(self) -> int:
+        return len(self.expiries)
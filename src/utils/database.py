@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, TypeVar
+
+logger = logging.getLogger("discord")
+
+T = TypeVar("T")
+
+
+class StorageProfile(NamedTuple):
+    """The pragmas every connection is tuned with. cache_size is in KiB and mmap_size in bytes."""
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = 64 * 1024
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 5000
+
+
+STORAGE_PROFILES = {
+    # Every commit is fsynced, at the cost of slower writes
+    "durable": StorageProfile(synchronous="FULL", cache_size=16 * 1024, mmap_size=0),
+    # WAL with NORMAL sync only risks the last commits on power loss, never corruption
+    "balanced": StorageProfile(),
+    # Trades memory for fewer disk reads on hosts with RAM to spare
+    "fast": StorageProfile(cache_size=256 * 1024, mmap_size=1024 * 1024 * 1024),
+}
+
+
+class Database:
+    """Class to run all SQL for the bot off of the event loop.
+
+    Every write goes through one dedicated writer thread so writes never contend with each other,
+    while reads are spread over a small pool of read-only WAL connections so they never wait behind writes.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        reader_count: int = 4,
+        storage_profile: StorageProfile = STORAGE_PROFILES["balanced"],
+    ) -> None:
+        self.db_path = db_path
+        self.reader_count = reader_count
+        self.storage_profile = storage_profile
+
+        self.writer_connection: Optional[sqlite3.Connection] = None
+        self.reader_connections: List[sqlite3.Connection] = []
+        self.reader_connections_lock = threading.Lock()
+        self.thread_local = threading.local()
+
+        self.writer_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="db-writer"
+        )
+        self.reader_executor = ThreadPoolExecutor(
+            max_workers=reader_count, thread_name_prefix="db-reader"
+        )
+
+    async def connect(self) -> None:
+        """Open the writer connection and apply the storage profile to the database."""
+
+        await self.run_write(lambda db: None)
+
+        logger.info("Database connected with storage profile: %s", self.storage_profile)
+
+    def apply_connection_pragmas(self, db: sqlite3.Connection) -> None:
+        """Apply the parts of the storage profile that only last for one connection."""
+
+        db.execute(f"PRAGMA cache_size = {-self.storage_profile.cache_size}")
+        db.execute(f"PRAGMA mmap_size = {self.storage_profile.mmap_size}")
+        db.execute(f"PRAGMA temp_store = {self.storage_profile.temp_store}")
+        db.execute(f"PRAGMA busy_timeout = {self.storage_profile.busy_timeout}")
+
+    def get_writer_connection(self) -> sqlite3.Connection:
+        """Return the writer connection, creating it on first use. Only called from the writer thread."""
+
+        if self.writer_connection is None:
+            self.writer_connection = sqlite3.connect(
+                self.db_path, check_same_thread=False
+            )
+
+            # WAL lets the reader connections keep reading while a write is in progress
+            self.writer_connection.execute(
+                f"PRAGMA journal_mode = {self.storage_profile.journal_mode}"
+            )
+            self.writer_connection.execute(
+                f"PRAGMA synchronous = {self.storage_profile.synchronous}"
+            )
+            self.apply_connection_pragmas(self.writer_connection)
+
+        return self.writer_connection
+
+    def get_reader_connection(self) -> sqlite3.Connection:
+        """Return the read-only connection of the current reader thread, creating it on first use."""
+
+        db = getattr(self.thread_local, "db", None)
+
+        if db is None:
+            db_uri = "file:{}?mode=ro".format(
+                urllib.parse.quote(os.path.abspath(self.db_path))
+            )
+            db = sqlite3.connect(db_uri, uri=True, check_same_thread=False)
+            self.apply_connection_pragmas(db)
+
+            self.thread_local.db = db
+
+            with self.reader_connections_lock:
+                self.reader_connections.append(db)
+
+        return db
+
+    async def run_write(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a callable with the writer connection on the writer thread."""
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.writer_executor, lambda: func(self.get_writer_connection())
+        )
+
+    async def run_read(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a callable with a read-only connection on the reader pool."""
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.reader_executor, lambda: func(self.get_reader_connection())
+        )
+
+    async def execute(self, sql: str, parameters: Sequence[Any] = ()) -> int:
+        """Execute a single write statement in its own transaction and return the affected row count."""
+
+        def write(db: sqlite3.Connection) -> int:
+            with db:
+                return db.execute(sql, parameters).rowcount
+
+        return await self.run_write(write)
+
+    async def executemany(
+        self, sql: str, seq_of_parameters: Iterable[Sequence[Any]]
+    ) -> int:
+        """Execute a write statement for every set of parameters in a single transaction."""
+
+        def write(db: sqlite3.Connection) -> int:
+            with db:
+                return db.executemany(sql, seq_of_parameters).rowcount
+
+        return await self.run_write(write)
+
+    async def fetchone(
+        self, sql: str, parameters: Sequence[Any] = ()
+    ) -> Optional[tuple]:
+        """Run a read query and return its first row."""
+
+        return await self.run_read(lambda db: db.execute(sql, parameters).fetchone())
+
+    async def fetchall(self, sql: str, parameters: Sequence[Any] = ()) -> List[tuple]:
+        """Run a read query and return all of its rows."""
+
+        return await self.run_read(lambda db: db.execute(sql, parameters).fetchall())
+
+    def close(self) -> None:
+        """Wait for queued work to finish and close every connection."""
+
+        self.reader_executor.shutdown(wait=True)
+        self.writer_executor.shutdown(wait=True)
+
+        with self.reader_connections_lock:
+            for db in self.reader_connections:
+                db.close()
+
+            self.reader_connections.clear()
+
+        if self.writer_connection is not None:
+            self.writer_connection.close()
+            self.writer_connection = None
+
+        logger.info("Database connections have been closed.")
@@ -0,0 +1,214 @@
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+logger = logging.getLogger("discord")
+
+BACKUP_PREFIX = "funtimes_"
+BACKUP_SUFFIXES = (".db.gz", ".db")
+DELTAS_SUFFIX = ".deltas"
+VERIFICATION_SUFFIX = ".verified.json"
+
+
+class BackupReport(NamedTuple):
+    """The outcome of one backup."""
+
+    path: str
+    pages: int
+    database_bytes: int
+    compressed_bytes: int
+    copy_duration: float
+    compress_duration: float
+
+
+def get_backup_date(filename: str) -> Optional[datetime]:
+    """Return the date in a backup filename, e.g. "funtimes_2024-07-19.db.gz", or None for other files."""
+
+    if not filename.startswith(BACKUP_PREFIX):
+        return None
+
+    for suffix in (*BACKUP_SUFFIXES, DELTAS_SUFFIX, VERIFICATION_SUFFIX):
+        if filename.endswith(suffix):
+            try:
+                return datetime.strptime(
+                    filename[len(BACKUP_PREFIX) : -len(suffix)], "%Y-%m-%d"
+                )
+
+            except ValueError:
+                break
+
+    logger.warning("Skipping file with invalid date format: %s", filename)
+    return None
+
+
+def get_backup_stem(backup_path: str) -> str:
+    """Return a full backup path without its suffix, e.g. "backups/funtimes_2024-07-19"."""
+
+    for suffix in BACKUP_SUFFIXES:
+        if backup_path.endswith(suffix):
+            return backup_path[: -len(suffix)]
+
+    raise ValueError(f"Not a full backup: {backup_path}")
+
+
+def get_deltas_dir(backup_path: str) -> str:
+    """Return the directory that holds the incremental backups taken on top of a full backup."""
+
+    return f"{get_backup_stem(backup_path)}{DELTAS_SUFFIX}"
+
+
+def get_verification_path(backup_path: str) -> str:
+    """Return the path of the checksums recorded when a full backup was first verified."""
+
+    return f"{get_backup_stem(backup_path)}{VERIFICATION_SUFFIX}"
+
+
+def get_latest_backup(backup_dir: str) -> Optional[str]:
+    """Return the path of the newest full backup."""
+
+    backups = [
+        (backup_date, filename)
+        for filename in os.listdir(backup_dir)
+        if filename.endswith(BACKUP_SUFFIXES)
+        and (backup_date := get_backup_date(filename))
+    ]
+
+    if not backups:
+        return None
+
+    return os.path.join(backup_dir, max(backups)[1])
+
+
+def remove_old_backups(backup_dir: str, retention_days: int = 7) -> List[str]:
+    """Remove backups, and the incremental backups on top of them, older than the retention period and return their paths."""
+
+    cutoff_date = datetime.now() - timedelta(retention_days)
+    removed_backups = []
+
+    for filename in os.listdir(backup_dir):
+        backup_date = get_backup_date(filename)
+
+        if backup_date and backup_date < cutoff_date:
+            backup_path = os.path.join(backup_dir, filename)
+
+            if os.path.isdir(backup_path):
+                shutil.rmtree(backup_path)
+            else:
+                os.remove(backup_path)
+
+            removed_backups.append(backup_path)
+
+            logger.info("Removed old backup: %s", backup_path)
+
+    return removed_backups
+
+
+def copy_database(
+    db_path: str, copy_path: str, pages_per_step: int, step_sleep: float
+) -> int:
+    """Copy a live database with the backup API a few pages at a time and return the page count."""
+
+    db_uri = "file:{}?mode=ro".format(urllib.parse.quote(os.path.abspath(db_path)))
+    source = sqlite3.connect(db_uri, uri=True)
+    destination = sqlite3.connect(copy_path)
+    logged_percentage = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal logged_percentage
+
+        percentage = (total - remaining) * 100 // total if total else 100
+
+        if percentage >= logged_percentage + 10:
+            logged_percentage = percentage - percentage % 10
+            logger.info("Database backup progress: %s%% of %s pages.", percentage, total)
+
+        # Gives the writer thread the disk between steps. Only this worker thread sleeps
+        time.sleep(step_sleep)
+
+    try:
+        # A read transaction pins one WAL snapshot, otherwise every write by the bot would restart the backup
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_master").fetchone()
+
+        source.backup(destination, pages=pages_per_step, progress=progress)
+
+        return destination.execute("PRAGMA page_count").fetchone()[0]
+
+    finally:
+        source.close()
+        destination.close()
+
+
+def backup_database(
+    db_path: str,
+    backup_dir: str,
+    retention_days: int = 7,
+    pages_per_step: int = 256,
+    step_sleep: float = 0.01,
+) -> BackupReport:
+    """Back up the database into a gzip compressed file and apply the retention period. Blocks, so run it on a worker thread."""
+
+    datestamp = datetime.now().strftime("%Y-%m-%d")
+    backup_path = os.path.join(backup_dir, f"{BACKUP_PREFIX}{datestamp}.db.gz")
+    copy_path = os.path.join(backup_dir, f"{BACKUP_PREFIX}{datestamp}.db.tmp")
+    compressed_path = f"{backup_path}.tmp"
+
+    try:
+        start_time = time.perf_counter()
+        pages = copy_database(db_path, copy_path, pages_per_step, step_sleep)
+        copy_duration = time.perf_counter() - start_time
+
+        # Compress in chunks so the database is never held in memory
+        start_time = time.perf_counter()
+
+        with open(copy_path, "rb") as copy_file, gzip.open(
+            compressed_path, "wb", compresslevel=6
+        ) as compressed_file:
+            shutil.copyfileobj(copy_file, compressed_file, 1024 * 1024)
+
+        compress_duration = time.perf_counter() - start_time
+
+        # Only replace an earlier backup of today once the new one is complete
+        os.replace(compressed_path, backup_path)
+
+        # Incremental backups of an earlier backup of today would roll rows back if replayed on this one
+        shutil.rmtree(get_deltas_dir(backup_path), ignore_errors=True)
+
+        # The checksums of an earlier backup of today would fail the verification of this one
+        if os.path.exists(get_verification_path(backup_path)):
+            os.remove(get_verification_path(backup_path))
+
+        report = BackupReport(
+            backup_path,
+            pages,
+            os.path.getsize(copy_path),
+            os.path.getsize(backup_path),
+            copy_duration,
+            compress_duration,
+        )
+
+    finally:
+        for temporary_path in (copy_path, compressed_path):
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    logger.info(
+        "Database backed up successfully to: %s (%s pages, %s bytes compressed to %s bytes, copied in %.2fs, compressed in %.2fs)",
+        report.path,
+        report.pages,
+        report.database_bytes,
+        report.compressed_bytes,
+        report.copy_duration,
+        report.compress_duration,
+    )
+
+    # Old backups are only removed once there is a newer one to fall back on
+    remove_old_backups(backup_dir, retention_days)
+
+    return report
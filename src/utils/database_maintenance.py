@@ -0,0 +1,109 @@
+import logging
+import os
+import sqlite3
+import time
+from typing import List, NamedTuple
+
+from utils.database import Database
+
+logger = logging.getLogger("discord")
+
+
+class MaintenanceStep(NamedTuple):
+    """The outcome of one maintenance statement."""
+
+    name: str
+    duration: float
+    reclaimed_bytes: int
+    result: tuple
+
+
+def get_storage_size(db_path: str) -> int:
+    """Return the bytes a database takes up on disk, including its WAL file."""
+
+    return sum(
+        os.path.getsize(path)
+        for path in (db_path, f"{db_path}-wal")
+        if os.path.exists(path)
+    )
+
+
+def run_step(
+    db: sqlite3.Connection, db_path: str, name: str, sql: str, has_result: bool
+) -> MaintenanceStep:
+    """Run one maintenance statement and measure how much disk space it gave back."""
+
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    free_pages_before = db.execute("PRAGMA freelist_count").fetchone()[0]
+    size_before = get_storage_size(db_path)
+    start_time = time.perf_counter()
+
+    # execute() only steps once, which makes incremental_vacuum free a single page, so others run as a script
+    if has_result:
+        result = db.execute(sql).fetchall()
+    else:
+        db.executescript(sql)
+        result = []
+
+    duration = time.perf_counter() - start_time
+    free_pages_after = db.execute("PRAGMA freelist_count").fetchone()[0]
+
+    # Freed pages only leave the main file at the next checkpoint, so count them as reclaimed straight away
+    reclaimed_bytes = max(
+        size_before - get_storage_size(db_path),
+        (free_pages_before - free_pages_after) * page_size,
+    )
+
+    return MaintenanceStep(
+        name, duration, reclaimed_bytes, tuple(result[0]) if result else ()
+    )
+
+
+def run_maintenance(db: sqlite3.Connection, db_path: str) -> List[MaintenanceStep]:
+    """Run every maintenance step with the writer connection."""
+
+    # The checkpoint goes last so it also truncates what the vacuum freed up
+    return [
+        run_step(db, db_path, "optimize", "PRAGMA optimize", False),
+        run_step(
+            db, db_path, "incremental_vacuum", "PRAGMA incremental_vacuum", False
+        ),
+        run_step(
+            db, db_path, "wal_checkpoint", "PRAGMA wal_checkpoint(TRUNCATE)", True
+        ),
+    ]
+
+
+async def maintain_database(db: Database) -> List[MaintenanceStep]:
+    """Run the maintenance steps on the writer thread, so writes wait for them instead of failing."""
+
+    size_before = get_storage_size(db.db_path)
+    steps = await db.run_write(lambda writer: run_maintenance(writer, db.db_path))
+
+    for step in steps:
+        logger.info(
+            "Database maintenance step '%s' took %.3fs and reclaimed %s bytes. Result: %s",
+            step.name,
+            step.duration,
+            step.reclaimed_bytes,
+            step.result,
+        )
+
+    # A busy checkpoint couldn't copy every frame, e.g. because a reader was still on an old snapshot
+    checkpoint_result = steps[-1].result
+
+    if checkpoint_result and checkpoint_result[0]:
+        logger.warning(
+            "WAL checkpoint was blocked by readers, %s of %s frames were checkpointed.",
+            checkpoint_result[2],
+            checkpoint_result[1],
+        )
+
+    logger.info(
+        "Database maintenance finished in %.3fs, the database went from %s to %s bytes.",
+        sum(step.duration for step in steps),
+        size_before,
+        get_storage_size(db.db_path),
+    )
+
+    return steps
@@ -17,3 +17,21 @@ class InitialAuthorCheckFailure(commands.CheckFailure):
 	"""
 
 	pass
+
+
+class RankCardRendererBusy(Exception):
+	"""Exception raised when the rank card render queue is full.
+
+	Inherits from 'Exception'.
+	"""
+
+	pass
+
+
+class RestSchedulerBacklogFull(Exception):
+	"""Exception raised when too many background REST calls are already waiting to be sent.
+
+	Inherits from 'Exception'.
+	"""
+
+	pass
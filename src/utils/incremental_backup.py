@@ -0,0 +1,247 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+from utils.database_backup import get_deltas_dir
+
+logger = logging.getLogger("discord")
+
+DELTA_SUFFIX = ".jsonl.gz"
+
+# Deleted rows are stored with None for every column but the key
+ChangedRow = Tuple[int, int, Optional[int], Optional[int], Optional[float]]
+
+
+class RestoreReport(NamedTuple):
+    """The outcome of restoring a full backup and its incremental backups."""
+
+    path: str
+    deltas_applied: int
+    rows_replayed: int
+    decompress_duration: float
+    replay_duration: float
+
+
+def clear_changelog(db: sqlite3.Connection) -> None:
+    """Forget every captured change, e.g. ones made while replaying incremental backups into a restored database."""
+
+    with db:
+        db.execute("DELETE FROM level_changelog")
+
+
+def take_changes(db: sqlite3.Connection) -> List[ChangedRow]:
+    """Return the current state of every level row changed since the last call and clear the changelog.
+
+    Must run with the writer connection, so no change can land between reading and clearing the changelog.
+    """
+
+    db.execute("BEGIN IMMEDIATE")
+
+    try:
+        changed_rows = db.execute(
+            """
+            SELECT changelog.user_id, changelog.guild_id, level.experience, level.level, level.previous_message_timestamp
+            FROM level_changelog AS changelog
+            LEFT JOIN level ON level.user_id = changelog.user_id AND level.guild_id = changelog.guild_id
+            """
+        ).fetchall()
+        db.execute("DELETE FROM level_changelog")
+        db.commit()
+
+    except sqlite3.Error:
+        db.rollback()
+        raise
+
+    return changed_rows
+
+
+def restore_changes(db: sqlite3.Connection, changed_rows: List[ChangedRow]) -> None:
+    """Put taken changes back into the changelog, e.g. when writing their incremental backup failed."""
+
+    with db:
+        db.executemany(
+            "INSERT OR IGNORE INTO level_changelog (user_id, guild_id) VALUES (?, ?)",
+            [(user_id, guild_id) for user_id, guild_id, *_ in changed_rows],
+        )
+
+
+def get_delta_paths(deltas_dir: str) -> List[str]:
+    """Return the incremental backups in a deltas directory in the order they were taken."""
+
+    if not os.path.isdir(deltas_dir):
+        return []
+
+    return [
+        os.path.join(deltas_dir, filename)
+        for filename in sorted(os.listdir(deltas_dir))
+        if filename.endswith(DELTA_SUFFIX)
+    ]
+
+
+def write_delta(backup_path: str, changed_rows: List[ChangedRow]) -> str:
+    """Write changed rows as the next incremental backup on top of a full backup and return its path."""
+
+    deltas_dir = get_deltas_dir(backup_path)
+    os.makedirs(deltas_dir, exist_ok=True)
+
+    delta_paths = get_delta_paths(deltas_dir)
+    sequence = int(os.path.basename(delta_paths[-1]).split("_")[0]) + 1 if delta_paths else 1
+    timestamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+
+    delta_path = os.path.join(deltas_dir, f"{sequence:06d}_{timestamp}{DELTA_SUFFIX}")
+    temporary_path = f"{delta_path}.tmp"
+
+    # One header line followed by one JSON array per row, so restores can stream it
+    with gzip.open(temporary_path, "wt", encoding="utf-8") as delta_file:
+        delta_file.write(
+            json.dumps({"base": os.path.basename(backup_path), "rows": len(changed_rows)})
+        )
+        delta_file.write("\n")
+
+        for changed_row in changed_rows:
+            delta_file.write(json.dumps(changed_row))
+            delta_file.write("\n")
+
+    os.replace(temporary_path, delta_path)
+
+    return delta_path
+
+
+def replay_delta(db: sqlite3.Connection, delta_path: str, backup_path: str) -> int:
+    """Apply one incremental backup in a single transaction and return how many rows it held."""
+
+    upserts = []
+    deletes = []
+
+    with gzip.open(delta_path, "rt", encoding="utf-8") as delta_file:
+        header = json.loads(delta_file.readline())
+
+        if header["base"] != os.path.basename(backup_path):
+            raise ValueError(
+                f"{delta_path} was taken on top of {header['base']}, not {os.path.basename(backup_path)}"
+            )
+
+        for line in delta_file:
+            user_id, guild_id, experience, level, previous_message_timestamp = json.loads(line)
+
+            if experience is None:
+                deletes.append((user_id, guild_id))
+            else:
+                upserts.append(
+                    (user_id, guild_id, experience, level, previous_message_timestamp)
+                )
+
+    with db:
+        db.executemany(
+            """
+            INSERT INTO level (user_id, guild_id, experience, level, previous_message_timestamp)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, guild_id) DO UPDATE SET
+                experience=excluded.experience,
+                level=excluded.level,
+                previous_message_timestamp=excluded.previous_message_timestamp
+            """,
+            upserts,
+        )
+        db.executemany(
+            "DELETE FROM level WHERE user_id = ? AND guild_id = ?", deletes
+        )
+
+    return len(upserts) + len(deletes)
+
+
+def restore_backup(backup_path: str, output_path: str) -> RestoreReport:
+    """Rebuild a database from a full backup plus every incremental backup taken on top of it."""
+
+    temporary_path = f"{output_path}.tmp"
+    start_time = time.perf_counter()
+
+    open_backup = gzip.open if backup_path.endswith(".gz") else open
+
+    with open_backup(backup_path, "rb") as backup_file, open(
+        temporary_path, "wb"
+    ) as temporary_file:
+        shutil.copyfileobj(backup_file, temporary_file, 1024 * 1024)
+
+    decompress_duration = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+
+    delta_paths = get_delta_paths(get_deltas_dir(backup_path))
+    rows_replayed = 0
+    db = sqlite3.connect(temporary_path)
+
+    try:
+        # Nothing needs to survive a crash halfway through, so skip the journal until the replay is done
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+
+        for delta_path in delta_paths:
+            rows_replayed += replay_delta(db, delta_path, backup_path)
+
+        # The restored database is a new starting point, so the replay itself isn't a change to back up
+        clear_changelog(db)
+        db.execute("PRAGMA journal_mode = WAL")
+
+    finally:
+        db.close()
+
+    os.replace(temporary_path, output_path)
+
+    report = RestoreReport(
+        output_path,
+        len(delta_paths),
+        rows_replayed,
+        decompress_duration,
+        time.perf_counter() - start_time,
+    )
+
+    logger.info(
+        "Restored %s with %s incremental backups (%s rows) to %s. Decompressed in %.2fs, replayed in %.2fs.",
+        backup_path,
+        report.deltas_applied,
+        report.rows_replayed,
+        report.path,
+        report.decompress_duration,
+        report.replay_duration,
+    )
+
+    return report
+
+
+def swap_database(restored_path: str, db_path: str) -> str:
+    """Atomically replace a database with a restored one and return where the previous one was kept.
+
+    The bot must not be running, since it would keep writing to the previous database.
+    """
+
+    previous_path = f"{db_path}.pre-restore"
+
+    if os.path.exists(db_path):
+        db = sqlite3.connect(db_path)
+
+        try:
+            # A leftover WAL would be replayed into the restored database
+            busy, _, _ = db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            db.execute("PRAGMA journal_mode = DELETE")
+
+        finally:
+            db.close()
+
+        if busy or os.path.exists(f"{db_path}-wal"):
+            raise sqlite3.OperationalError(f"{db_path} is still in use")
+
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+
+        # A hard link keeps the previous database without ever leaving db_path missing
+        os.link(db_path, previous_path)
+
+    os.replace(restored_path, db_path)
+
+    return previous_path
@@ -0,0 +1,165 @@
+import logging
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.database import Database
+from utils.skiplist import IndexableSkipList
+
+logger = logging.getLogger("discord")
+
+USER_ID_MASK = (1 << 64) - 1
+
+# Every member is stored as an (experience, level) tuple of the same size
+MEMBER_BYTES = sys.getsizeof((0, 0))
+
+
+class GuildLeaderboard:
+    """Class to hold the ranked members of a single guild.
+
+    Members are kept in an IndexableSkipList of packed int keys that sort by experience descending
+    and then by user ID, next to a dict of each member's (experience, level).
+    """
+
+    def __init__(self) -> None:
+        self.ranking = IndexableSkipList()
+        self.members: Dict[int, Tuple[int, int]] = {}
+
+    @staticmethod
+    def make_key(user_id: int, experience: int) -> int:
+        """Pack a member into one int. Discord snowflakes always fit into 64 bits."""
+
+        return (-experience << 64) | user_id
+
+    def update(self, user_id: int, experience: int, level: int) -> None:
+        """Insert a member or move them to their new position."""
+
+        previous_data = self.members.get(user_id)
+
+        if previous_data is None or previous_data[0] != experience:
+            if previous_data is not None:
+                self.ranking.remove(self.make_key(user_id, previous_data[0]))
+
+            self.ranking.insert(self.make_key(user_id, experience))
+
+        self.members[user_id] = (experience, level)
+
+    def at(self, position: int) -> Tuple[int, int, int]:
+        """Return the (user_id, experience, level) of the member at a 0-based position."""
+
+        user_id = self.ranking[position] & USER_ID_MASK
+        experience, level = self.members[user_id]
+
+        return user_id, experience, level
+
+    def memory_footprint(self) -> int:
+        """Return the approximate amount of bytes used by this guild's leaderboard in O(1)."""
+
+        members_bytes = sys.getsizeof(self.members) + len(self.members) * MEMBER_BYTES
+
+        return self.ranking.memory_footprint() + members_bytes
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class LeaderboardEngine:
+    """Class to answer every leaderboard & rank query from memory.
+
+    Each guild's members are loaded from the level table once at startup and then kept
+    up to date as XP is given out, so top-N, position and rank lookups never need SQL.
+
+    A guild filter limits the engine to the guilds of one cluster, so clusters don't each hold every guild.
+    """
+
+    def __init__(self, guild_filter: Optional[Callable[[int], bool]] = None) -> None:
+        self.guilds: Dict[int, GuildLeaderboard] = {}
+        self.guild_filter = guild_filter
+
+    async def load(self, db: Database) -> None:
+        """Build every guild's leaderboard from the level table."""
+
+        start_time = time.perf_counter()
+
+        def load_rows(reader: sqlite3.Connection) -> None:
+            for guild_id, user_id, experience, level in reader.execute(
+                "SELECT guild_id, user_id, experience, level FROM level"
+            ):
+                self.update(guild_id, user_id, experience, level)
+
+        # Stream the rows on a reader thread so the whole table is never held in a list
+        await db.run_read(load_rows)
+
+        logger.info(
+            "Leaderboard engine loaded %s members across %s guilds in %.2fs.",
+            sum(len(guild) for guild in self.guilds.values()),
+            len(self.guilds),
+            time.perf_counter() - start_time,
+        )
+
+    def update(self, guild_id: int, user_id: int, experience: int, level: int) -> None:
+        """Record a member's latest experience & level."""
+
+        guild = self.guilds.get(guild_id)
+
+        if guild is None:
+            if self.guild_filter and not self.guild_filter(guild_id):
+                return
+
+            guild = self.guilds[guild_id] = GuildLeaderboard()
+
+        guild.update(user_id, experience, level)
+
+    def get(self, guild_id: int, user_id: int) -> Optional[Tuple[int, int]]:
+        """Return the (experience, level) of a member if they have any level data."""
+
+        guild = self.guilds.get(guild_id)
+
+        return guild.members.get(user_id) if guild else None
+
+    def guild_size(self, guild_id: int) -> int:
+        """Return the amount of ranked members in a guild."""
+
+        guild = self.guilds.get(guild_id)
+
+        return len(guild) if guild else 0
+
+    def top(self, guild_id: int, amount: int) -> List[Tuple[int, int, int]]:
+        """Return the (user_id, experience, level) of the highest ranked members of a guild."""
+
+        guild = self.guilds.get(guild_id)
+
+        if not guild:
+            return []
+
+        return [guild.at(position) for position in range(min(amount, len(guild)))]
+
+    def at(self, guild_id: int, position: int) -> Optional[Tuple[int, int, int]]:
+        """Return the (user_id, experience, level) of the member at a 1-based rank position."""
+
+        guild = self.guilds.get(guild_id)
+
+        if not guild or not 1 <= position <= len(guild):
+            return None
+
+        return guild.at(position - 1)
+
+    def rank_of(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Return the 1-based rank position of a member."""
+
+        guild = self.guilds.get(guild_id)
+        member_data = guild.members.get(user_id) if guild else None
+
+        if member_data is None:
+            return None
+
+        return guild.ranking.index(guild.make_key(user_id, member_data[0])) + 1
+
+    def memory_report(self) -> Dict[int, Tuple[int, int]]:
+        """Return the (member count, approximate bytes) of every guild's leaderboard."""
+
+        return {
+            guild_id: (len(guild), guild.memory_footprint())
+            for guild_id, guild in self.guilds.items()
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import sqlite3
+from typing import Dict, Optional, Tuple, Union
+
+from utils.database import Database
+
+logger = logging.getLogger("discord")
+
+
+class LevelBuffer:
+    """Class to hold dirty level rows in memory until they are written to the database.
+
+    Rows are keyed by (user_id, guild_id) and are written back in a single
+    executemany transaction on the database writer thread whenever flush() is called.
+    """
+
+    def __init__(self, db: Database, max_dirty_rows: int = 500) -> None:
+        self.db = db
+        self.max_dirty_rows = max_dirty_rows
+        self.dirty_rows: Dict[Tuple[int, int], Dict[str, Union[int, float]]] = {}
+        self.flushing_rows: Dict[Tuple[int, int], Dict[str, Union[int, float]]] = {}
+        # One flush at a time, so flushing_rows always holds the only batch in flight
+        self.flush_lock = asyncio.Lock()
+
+    def get(
+        self, user_id: int, guild_id: int
+    ) -> Optional[Dict[str, Union[int, float]]]:
+        """Return the buffered row of a user if it hasn't been committed yet."""
+
+        key = (user_id, guild_id)
+
+        # Rows that are mid-flush are still newer than what readers can see in the db
+        return self.dirty_rows.get(key) or self.flushing_rows.get(key)
+
+    def mark_dirty(self, user_data: Dict[str, Union[int, float]]) -> None:
+        """Store a user's level row so it gets written on the next flush."""
+
+        self.dirty_rows[(user_data["user_id"], user_data["guild_id"])] = user_data
+
+    def is_full(self) -> bool:
+        """Check if the buffer has reached its size threshold."""
+
+        return len(self.dirty_rows) >= self.max_dirty_rows
+
+    async def flush(self) -> int:
+        """Write all dirty rows to the database and return how many were written."""
+
+        async with self.flush_lock:
+            if not self.dirty_rows:
+                return 0
+
+            # Swap the buffer out first so rows dirtied during the write aren't lost
+            rows, self.dirty_rows = self.dirty_rows, {}
+            self.flushing_rows = rows
+
+            try:
+                await self.db.executemany(
+                    """
+                    INSERT INTO level (user_id, guild_id, experience, level, previous_message_timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, guild_id) DO UPDATE SET
+                        experience=excluded.experience,
+                        level=excluded.level,
+                        previous_message_timestamp=excluded.previous_message_timestamp
+                    """,
+                    [
+                        (
+                            user_data["user_id"],
+                            user_data["guild_id"],
+                            user_data["experience"],
+                            user_data["level"],
+                            user_data["previous_message_timestamp"],
+                        )
+                        for user_data in rows.values()
+                    ],
+                )
+
+            except sqlite3.Error as e:
+                logger.error("Error flushing %s buffered level rows: %s", len(rows), e)
+
+                # Requeue the failed rows without overwriting any newer versions of them
+                for key, user_data in rows.items():
+                    self.dirty_rows.setdefault(key, user_data)
+
+                return 0
+
+            finally:
+                self.flushing_rows = {}
+
+            return len(rows)
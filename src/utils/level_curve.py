@@ -0,0 +1,67 @@
+import bisect
+import math
+from typing import List
+
+XP_PER_STEP = 62
+LEVEL_EXPONENT = 0.55
+
+
+def calculate_level(experience: int) -> int:
+    """Return the level for an amount of XP using the original floating-point formula."""
+
+    return int((experience // XP_PER_STEP) ** LEVEL_EXPONENT) + 1
+
+
+def calculate_threshold(level: int) -> int:
+    """Return the smallest amount of XP that calculate_level() puts at a level."""
+
+    if level <= 1:
+        return 0
+
+    # Start from the inverse of the formula and then nudge it until it agrees with calculate_level() exactly
+    steps = math.ceil((level - 1) ** (1 / LEVEL_EXPONENT))
+
+    while steps > 0 and calculate_level((steps - 1) * XP_PER_STEP) >= level:
+        steps -= 1
+
+    while calculate_level(steps * XP_PER_STEP) < level:
+        steps += 1
+
+    return steps * XP_PER_STEP
+
+
+class LevelCurve:
+    """Class to hold the integer XP threshold of every level up to a max level.
+
+    xp -> level is a bisect over the thresholds and level -> xp is an index lookup,
+    so no code path needs a floating-point pow per message.
+    """
+
+    def __init__(self, max_level: int = 1000) -> None:
+        self.max_level = max_level
+
+        # thresholds[i] is the XP needed to reach level i + 1
+        self.thresholds: List[int] = [
+            calculate_threshold(level) for level in range(1, max_level + 1)
+        ]
+
+    def level_for_xp(self, experience: int) -> int:
+        """Return the level that an amount of XP reaches."""
+
+        if experience >= self.thresholds[-1]:
+            return calculate_level(experience)
+
+        return bisect.bisect_right(self.thresholds, experience)
+
+    def xp_for_level(self, level: int) -> int:
+        """Return the total amount of XP needed to reach a level."""
+
+        if level > self.max_level:
+            return calculate_threshold(level)
+
+        return self.thresholds[max(level, 1) - 1]
+
+    def xp_until_next_level(self, experience: int, level: int) -> int:
+        """Return how much more XP a member at a level needs to reach the next one."""
+
+        return max(self.xp_for_level(level + 1) - experience, 0)
@@ -0,0 +1,229 @@
+import numpy as np
+
+import asyncio
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from utils.database import Database
+from utils.level_curve import LEVEL_EXPONENT, XP_PER_STEP, LevelCurve
+
+# Rows are streamed in primary key order so the table is never loaded all at once
+SELECT_CHUNK_SQL = """
+    SELECT user_id, guild_id, experience, level FROM level
+    WHERE (user_id, guild_id) > (?, ?)
+    ORDER BY user_id, guild_id
+    LIMIT ?
+"""
+
+# Bounds the key range of a chunk when changed chunks are scanned again
+SELECT_RANGE_SQL = """
+    SELECT user_id, guild_id, experience, level FROM level
+    WHERE (user_id, guild_id) > (?, ?) AND (user_id, guild_id) <= (?, ?)
+    ORDER BY user_id, guild_id
+    LIMIT ?
+"""
+
+# Only rows whose XP hasn't changed since they were read get relevelled, so live XP updates always win
+UPDATE_LEVEL_SQL = """
+    UPDATE level SET level=? WHERE user_id=? AND guild_id=? AND experience=?
+"""
+
+
+class RelevelReport:
+    """Class to collect the results of a relevel run."""
+
+    def __init__(self, dry_run: bool) -> None:
+        self.dry_run = dry_run
+        self.rows_scanned = 0
+        self.rows_changed = 0
+        self.rows_rechecked = 0
+        self.level_deltas: Counter = Counter()
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_chunk(self, row_count: int, deltas: np.ndarray) -> None:
+        """Record the level changes found in a chunk."""
+
+        self.rows_scanned += row_count
+        self.rows_changed += len(deltas)
+
+        for delta, count in zip(*np.unique(deltas, return_counts=True)):
+            self.level_deltas[int(delta)] += int(count)
+
+        self.elapsed = time.perf_counter() - self.start_time
+
+    def rows_per_second(self) -> float:
+        return self.rows_scanned / self.elapsed if self.elapsed else 0.0
+
+    def histogram_lines(self) -> List[str]:
+        """Return one line per level change, e.g. '+2 levels: 153 users'."""
+
+        return [
+            f"{delta:+d} level{'s' if abs(delta) != 1 else ''}: {count} users"
+            for delta, count in sorted(self.level_deltas.items())
+        ]
+
+    def summary(self) -> str:
+        """Return a multi-line summary of the run."""
+
+        lines = [
+            f"{'Dry run' if self.dry_run else 'Relevel'} scanned {self.rows_scanned} rows in {self.elapsed:.2f}s ({self.rows_per_second():.0f} rows/sec).",
+            f"{self.rows_changed} rows {'would change' if self.dry_run else 'changed'} level.",
+        ]
+
+        if self.rows_rechecked:
+            lines.append(
+                f"{self.rows_rechecked} rows given XP during the run were relevelled again."
+            )
+
+        return "\n".join(lines + self.histogram_lines())
+
+
+def recompute_levels(experience: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """Return the level of every XP value in an array."""
+
+    levels = np.searchsorted(thresholds, experience, side="right")
+
+    # XP past the precomputed table falls back to the formula, same as LevelCurve.level_for_xp()
+    beyond_table = experience >= thresholds[-1]
+
+    if beyond_table.any():
+        levels[beyond_table] = (
+            np.floor_divide(experience[beyond_table], XP_PER_STEP) ** LEVEL_EXPONENT
+        ).astype(np.int64) + 1
+
+    return levels
+
+
+def process_chunk(
+    rows: Sequence[Tuple[int, int, int, int]], thresholds: np.ndarray
+) -> Tuple[List[Tuple[int, int, int, int]], np.ndarray]:
+    """Return the (level, user_id, guild_id, experience) updates of a chunk and their level deltas."""
+
+    experience = np.fromiter(
+        (row[2] for row in rows), dtype=np.int64, count=len(rows)
+    )
+    stored_levels = np.fromiter(
+        (row[3] for row in rows), dtype=np.int64, count=len(rows)
+    )
+
+    new_levels = recompute_levels(experience, thresholds)
+    changed_indexes = np.nonzero(new_levels != stored_levels)[0]
+
+    updates = [
+        (int(new_levels[i]), rows[i][0], rows[i][1], rows[i][2])
+        for i in changed_indexes
+    ]
+
+    return updates, new_levels[changed_indexes] - stored_levels[changed_indexes]
+
+
+def relevel_connection(
+    db: sqlite3.Connection,
+    level_curve: LevelCurve,
+    chunk_size: int = 50000,
+    dry_run: bool = False,
+    progress: Optional[Callable[[RelevelReport], None]] = None,
+) -> RelevelReport:
+    """Relevel every row of the level table through a plain sqlite3 connection."""
+
+    thresholds = np.array(level_curve.thresholds, dtype=np.int64)
+    report = RelevelReport(dry_run)
+    last_key = (-1, -1)
+
+    while True:
+        rows = db.execute(SELECT_CHUNK_SQL, (*last_key, chunk_size)).fetchall()
+
+        if not rows:
+            break
+
+        updates, deltas = process_chunk(rows, thresholds)
+
+        if updates and not dry_run:
+            with db:
+                db.executemany(UPDATE_LEVEL_SQL, updates)
+
+        report.add_chunk(len(rows), deltas)
+        last_key = (rows[-1][0], rows[-1][1])
+
+        if progress:
+            progress(report)
+
+    return report
+
+
+async def relevel_database(
+    db: Database,
+    level_curve: LevelCurve,
+    chunk_size: int = 50000,
+    dry_run: bool = False,
+    on_updates: Optional[Callable[[List[Tuple[int, int, int, int]]], None]] = None,
+    flush: Optional[Callable[[], Awaitable[Any]]] = None,
+    max_passes: int = 3,
+) -> RelevelReport:
+    """Relevel every row of the level table through the bot's database without blocking the event loop.
+
+    Each chunk is read on the reader pool and written in its own transaction on the writer thread,
+    so XP flushes can still get through in between chunks. XP given during the run can keep a row
+    at its old level, so the chunks that changed are flushed and scanned again until none change.
+    """
+
+    thresholds = np.array(level_curve.thresholds, dtype=np.int64)
+    report = RelevelReport(dry_run)
+    last_key = (-1, -1)
+    changed_ranges = []
+
+    if flush:
+        await flush()
+
+    while True:
+        rows = await db.fetchall(SELECT_CHUNK_SQL, (*last_key, chunk_size))
+
+        if not rows:
+            break
+
+        updates, deltas = await asyncio.to_thread(process_chunk, rows, thresholds)
+
+        if updates and not dry_run:
+            await db.executemany(UPDATE_LEVEL_SQL, updates)
+
+            if on_updates:
+                on_updates(updates)
+
+            changed_ranges.append((last_key, (rows[-1][0], rows[-1][1])))
+
+        report.add_chunk(len(rows), deltas)
+        last_key = (rows[-1][0], rows[-1][1])
+
+    # Later passes only fix up the first one, so they are left out of the histogram
+    for _ in range(max_passes - 1):
+        if not changed_ranges:
+            break
+
+        if flush:
+            await flush()
+
+        ranges, changed_ranges = changed_ranges, []
+
+        for start_key, end_key in ranges:
+            # Members who joined during the run can push a range past one chunk
+            while rows := await db.fetchall(
+                SELECT_RANGE_SQL, (*start_key, *end_key, chunk_size)
+            ):
+                updates, _ = await asyncio.to_thread(process_chunk, rows, thresholds)
+                next_key = (rows[-1][0], rows[-1][1])
+
+                if updates:
+                    await db.executemany(UPDATE_LEVEL_SQL, updates)
+
+                    if on_updates:
+                        on_updates(updates)
+
+                    report.rows_rechecked += len(updates)
+                    changed_ranges.append((start_key, next_key))
+
+                start_key = next_key
+
+    return report
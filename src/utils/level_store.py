@@ -0,0 +1,223 @@
+import abc
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.database import Database
+from utils.leaderboard_engine import LeaderboardEngine
+from utils.level_buffer import LevelBuffer
+
+UserData = Dict[str, Union[int, float]]
+
+
+def new_user_data(user_id: int, guild_id: int) -> UserData:
+    """Return the level row of a member that has no level data yet."""
+
+    return {
+        "user_id": user_id,
+        "guild_id": guild_id,
+        "experience": 0,
+        "level": 1,
+        "previous_message_timestamp": 0,
+    }
+
+
+class LevelStore(abc.ABC):
+    """Interface for where the level rows of members are kept.
+
+    Rows are dicts with the columns of the level table. Ranking queries order members
+    the same way the leaderboard does: by experience descending and then by user ID.
+    """
+
+    @abc.abstractmethod
+    async def get(self, user_id: int, guild_id: int) -> Optional[UserData]:
+        """Return the level row of a member if they have any level data."""
+
+    async def upsert(self, user_data: UserData) -> None:
+        """Insert or update the level row of a member."""
+
+        await self.upsert_many([user_data])
+
+    @abc.abstractmethod
+    async def upsert_many(self, rows: Iterable[UserData]) -> None:
+        """Insert or update multiple level rows at once."""
+
+    @abc.abstractmethod
+    async def flush(self) -> int:
+        """Make every upserted row durable and return how many rows were written."""
+
+    @abc.abstractmethod
+    async def guild_size(self, guild_id: int) -> int:
+        """Return the amount of ranked members in a guild."""
+
+    @abc.abstractmethod
+    async def top(self, guild_id: int, amount: int) -> List[Tuple[int, int, int]]:
+        """Return the (user_id, experience, level) of the highest ranked members of a guild."""
+
+    @abc.abstractmethod
+    async def rank_of(self, guild_id: int, user_id: int) -> Optional[int]:
+        """Return the 1-based rank position of a member."""
+
+    @abc.abstractmethod
+    async def at(self, guild_id: int, position: int) -> Optional[Tuple[int, int, int]]:
+        """Return the (user_id, experience, level) of the member at a 1-based rank position."""
+
+
+class SQLiteLevelStore(LevelStore):
+    """Level store backed by the level table.
+
+    Upserts are held in a LevelBuffer and written in batches on the database writer thread.
+    When a leaderboard engine is given, it is kept up to date on every upsert and answers
+    the ranking queries from memory. Without one, ranking queries walk the (guild_id, experience) index.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        leaderboard_engine: Optional[LeaderboardEngine] = None,
+        max_dirty_rows: int = 500,
+    ) -> None:
+        self.db = db
+        self.leaderboard_engine = leaderboard_engine
+        self.buffer = LevelBuffer(db, max_dirty_rows)
+
+    async def get(self, user_id: int, guild_id: int) -> Optional[UserData]:
+        # Rows that haven't been flushed yet are newer than what is in the db
+        buffered_user_data = self.buffer.get(user_id, guild_id)
+
+        if buffered_user_data:
+            return buffered_user_data
+
+        res = await self.db.fetchone(
+            "SELECT experience, level, previous_message_timestamp FROM level WHERE user_id = ? AND guild_id = ?",
+            (user_id, guild_id),
+        )
+
+        if res is None:
+            return None
+
+        return {
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "experience": res[0],
+            "level": res[1],
+            "previous_message_timestamp": res[2],
+        }
+
+    async def upsert_many(self, rows: Iterable[UserData]) -> None:
+        for user_data in rows:
+            self.buffer.mark_dirty(user_data)
+
+            if self.leaderboard_engine:
+                self.leaderboard_engine.update(
+                    user_data["guild_id"],
+                    user_data["user_id"],
+                    user_data["experience"],
+                    user_data["level"],
+                )
+
+        # Flush early instead of waiting for the timer if the buffer is getting large
+        if self.buffer.is_full():
+            await self.buffer.flush()
+
+    async def flush(self) -> int:
+        return await self.buffer.flush()
+
+    async def flush_for_ranking(self) -> None:
+        """Write buffered rows before a ranking query, since SQL can't see them yet."""
+
+        if self.buffer.dirty_rows:
+            await self.buffer.flush()
+
+    async def guild_size(self, guild_id: int) -> int:
+        if self.leaderboard_engine:
+            return self.leaderboard_engine.guild_size(guild_id)
+
+        await self.flush_for_ranking()
+
+        res = await self.db.fetchone(
+            "SELECT COUNT(*) FROM level WHERE guild_id = ?", (guild_id,)
+        )
+
+        return res[0]
+
+    async def top(self, guild_id: int, amount: int) -> List[Tuple[int, int, int]]:
+        if self.leaderboard_engine:
+            return self.leaderboard_engine.top(guild_id, amount)
+
+        await self.flush_for_ranking()
+
+        return await self.db.fetchall(
+            "SELECT user_id, experience, level FROM level WHERE guild_id = ? ORDER BY experience DESC, user_id LIMIT ?",
+            (guild_id, amount),
+        )
+
+    async def rank_of(self, guild_id: int, user_id: int) -> Optional[int]:
+        if self.leaderboard_engine:
+            return self.leaderboard_engine.rank_of(guild_id, user_id)
+
+        await self.flush_for_ranking()
+
+        user_data = await self.get(user_id, guild_id)
+
+        if user_data is None:
+            return None
+
+        # Count the members ranked above instead of sorting the whole guild
+        res = await self.db.fetchone(
+            "SELECT COUNT(*) FROM level WHERE guild_id = ? AND (experience > ? OR (experience = ? AND user_id < ?))",
+            (guild_id, user_data["experience"], user_data["experience"], user_id),
+        )
+
+        return res[0] + 1
+
+    async def at(self, guild_id: int, position: int) -> Optional[Tuple[int, int, int]]:
+        if self.leaderboard_engine:
+            return self.leaderboard_engine.at(guild_id, position)
+
+        if position < 1:
+            return None
+
+        await self.flush_for_ranking()
+
+        return await self.db.fetchone(
+            "SELECT user_id, experience, level FROM level WHERE guild_id = ? ORDER BY experience DESC, user_id LIMIT 1 OFFSET ?",
+            (guild_id, position - 1),
+        )
+
+
+class MemoryLevelStore(LevelStore):
+    """Level store that only keeps rows in memory.
+
+    Nothing survives a restart, so it is meant for benchmarks and for running cogs without a database file.
+    """
+
+    def __init__(self) -> None:
+        self.rows: Dict[Tuple[int, int], UserData] = {}
+        self.leaderboard_engine = LeaderboardEngine()
+
+    async def get(self, user_id: int, guild_id: int) -> Optional[UserData]:
+        return self.rows.get((user_id, guild_id))
+
+    async def upsert_many(self, rows: Iterable[UserData]) -> None:
+        for user_data in rows:
+            self.rows[(user_data["user_id"], user_data["guild_id"])] = user_data
+            self.leaderboard_engine.update(
+                user_data["guild_id"],
+                user_data["user_id"],
+                user_data["experience"],
+                user_data["level"],
+            )
+
+    async def flush(self) -> int:
+        return 0
+
+    async def guild_size(self, guild_id: int) -> int:
+        return self.leaderboard_engine.guild_size(guild_id)
+
+    async def top(self, guild_id: int, amount: int) -> List[Tuple[int, int, int]]:
+        return self.leaderboard_engine.top(guild_id, amount)
+
+    async def rank_of(self, guild_id: int, user_id: int) -> Optional[int]:
+        return self.leaderboard_engine.rank_of(guild_id, user_id)
+
+    async def at(self, guild_id: int, position: int) -> Optional[Tuple[int, int, int]]:
+        return self.leaderboard_engine.at(guild_id, position)
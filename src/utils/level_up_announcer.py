@@ -0,0 +1,129 @@
+import discord
+from discord.ext import commands
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from utils.errors import RestSchedulerBacklogFull
+from utils.rest_scheduler import Priority
+
+logger = logging.getLogger("discord")
+
+
+class LevelUpAnnouncer:
+    """Class to coalesce level up announcements per channel.
+
+    Level ups are collected for `flush_interval` seconds after the first one in a channel
+    and then sent together, so a burst of level ups costs one message instead of one each.
+    A channel is never sent to more than once per `min_send_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        flush_interval: float = 3,
+        min_send_interval: float = 1,
+        max_members_per_message: int = 20,
+    ) -> None:
+        self.bot = bot
+        self.flush_interval = flush_interval
+        self.min_send_interval = min_send_interval
+        self.max_members_per_message = max_members_per_message
+
+        # Stored in {channel_id: {user_id: level}} format
+        self.pending_level_ups: Dict[int, Dict[int, int]] = {}
+        self.flush_tasks: Dict[int, asyncio.Task] = {}
+        self.last_sent: Dict[int, float] = {}
+
+        self.announced_level_ups = 0
+        self.messages_sent = 0
+
+    def announce(self, channel_id: int, user_id: int, level: int) -> None:
+        """Queue a level up to be announced with the next batch of its channel."""
+
+        channel_level_ups = self.pending_level_ups.setdefault(channel_id, {})
+
+        # A member that levels up twice in one window only needs their newest level announced
+        channel_level_ups[user_id] = max(level, channel_level_ups.get(user_id, 0))
+        self.announced_level_ups += 1
+
+        if channel_id not in self.flush_tasks:
+            next_allowed_send = (
+                self.last_sent.get(channel_id, 0) + self.min_send_interval
+            )
+            delay = max(self.flush_interval, next_allowed_send - time.monotonic())
+
+            self.flush_tasks[channel_id] = asyncio.create_task(
+                self.flush_channel(channel_id, delay)
+            )
+
+    async def flush_channel(self, channel_id: int, delay: float = 0) -> None:
+        """Wait out the batching window of a channel and send its level ups."""
+
+        try:
+            await asyncio.sleep(delay)
+
+        finally:
+            # The next level up in this channel starts a new window, even if this one was cancelled
+            self.flush_tasks.pop(channel_id, None)
+
+        level_ups = self.pending_level_ups.pop(channel_id, {})
+        channel = self.bot.get_channel(channel_id)
+
+        if not level_ups or not channel:
+            return
+
+        level_up_items = list(level_ups.items())
+
+        for i in range(0, len(level_up_items), self.max_members_per_message):
+            await self.send(
+                channel, level_up_items[i : i + self.max_members_per_message]
+            )
+
+    async def send(
+        self, channel: discord.abc.Messageable, level_ups: List[Tuple[int, int]]
+    ) -> None:
+        """Send one message announcing multiple level ups."""
+
+        content = "\n".join(
+            f"**<@{user_id}> Has Reached Level {level}!**" for user_id, level in level_ups
+        )
+
+        try:
+            await self.bot.rest_scheduler.submit(
+                Priority.ANNOUNCEMENTS,
+                ("channel", channel.id),
+                lambda: channel.send(content),
+            )
+            self.messages_sent += 1
+
+        except (discord.HTTPException, RestSchedulerBacklogFull) as error:
+            logger.error(
+                "Error announcing %s level ups in ChannelID: %s",
+                len(level_ups),
+                channel.id,
+                exc_info=error,
+            )
+
+        self.last_sent[channel.id] = time.monotonic()
+
+    async def close(self) -> None:
+        """Send every pending announcement straight away."""
+
+        for flush_task in list(self.flush_tasks.values()):
+            flush_task.cancel()
+
+        await asyncio.gather(*self.flush_tasks.values(), return_exceptions=True)
+
+        for channel_id in list(self.pending_level_ups):
+            await self.flush_channel(channel_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many level ups were announced and how many messages that took."""
+
+        return {
+            "announced_level_ups": self.announced_level_ups,
+            "messages_sent": self.messages_sent,
+        }
@@ -0,0 +1,267 @@
+import io
+import json
+import os
+import re
+import time
+import zipfile
+from datetime import date, datetime
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+INDEX_SUFFIX = ".index.json"
+
+ARCHIVE_PATTERN = re.compile(r"(?P<prefix>.*?)(?P<date>\d{4}-\d{2}-\d{2})\.zip")
+# Matches the start of a line written with the formatter of Config.setup_logger
+RECORD_PATTERN = re.compile(
+    r"\[ (?P<time>[\d\- :]{19}) \] \[ (?P<level>\w+)\s*\] \[ (?P<filename>.*?)\s* \] \[ (?P<function>.*?)\s* \] :: "
+)
+# The cogs log IDs as "(UserID: 123, GuildID: 456)"
+USER_ID_PATTERN = re.compile(r"UserID: (\d+)")
+GUILD_ID_PATTERN = re.compile(r"GuildID: (\d+)")
+
+
+class LogQuery(NamedTuple):
+    """Filters for searching the logs. Every filter that is set must match."""
+
+    levels: FrozenSet[str] = frozenset()
+    functions: FrozenSet[str] = frozenset()
+    user_ids: FrozenSet[int] = frozenset()
+    guild_ids: FrozenSet[int] = frozenset()
+    text: Optional[str] = None
+    since: Optional[date] = None
+    until: Optional[date] = None
+
+    def matches_date(self, log_date: date) -> bool:
+        """Whether a day of logs is inside the searched date range."""
+
+        return (self.since is None or log_date >= self.since) and (
+            self.until is None or log_date <= self.until
+        )
+
+    def matches_index(self, index: dict) -> bool:
+        """Whether a day of logs may hold a matching record, judging by its index."""
+
+        return (
+            (not self.levels or not self.levels.isdisjoint(index["levels"]))
+            and (not self.functions or not self.functions.isdisjoint(index["functions"]))
+            and (not self.user_ids or not self.user_ids.isdisjoint(index["user_ids"]))
+            and (not self.guild_ids or not self.guild_ids.isdisjoint(index["guild_ids"]))
+        )
+
+    def matches_record(self, record: str) -> bool:
+        """Whether a record matches every filter."""
+
+        level, function, user_ids, guild_ids = parse_record(record)
+
+        return (
+            (not self.levels or level in self.levels)
+            and (not self.functions or function in self.functions)
+            and (not self.user_ids or not self.user_ids.isdisjoint(user_ids))
+            and (not self.guild_ids or not self.guild_ids.isdisjoint(guild_ids))
+            and (self.text is None or self.text.lower() in record.lower())
+        )
+
+
+class SearchResult(NamedTuple):
+    """The matching records of a search and how much of the logs it had to read."""
+
+    records: List[Tuple[str, str]]
+    log_files: int
+    scanned_files: int
+    duration: float
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[str]:
+    """Group log lines into records, so e.g. a traceback stays with the line that logged it."""
+
+    record_lines = []
+
+    for line in lines:
+        if RECORD_PATTERN.match(line) and record_lines:
+            yield "".join(record_lines)
+            record_lines = []
+
+        record_lines.append(line)
+
+    if record_lines:
+        yield "".join(record_lines)
+
+
+def parse_record(record: str) -> Tuple[Optional[str], Optional[str], Set[int], Set[int]]:
+    """Return the level, function, user IDs and guild IDs of a record."""
+
+    match = RECORD_PATTERN.match(record)
+
+    return (
+        match["level"] if match else None,
+        match["function"] if match else None,
+        {int(user_id) for user_id in USER_ID_PATTERN.findall(record)},
+        {int(guild_id) for guild_id in GUILD_ID_PATTERN.findall(record)},
+    )
+
+
+def build_index(lines: Iterable[str]) -> dict:
+    """Return the record count per level plus every function, user ID and guild ID in a day of logs."""
+
+    levels: Dict[str, int] = {}
+    functions = set()
+    user_ids = set()
+    guild_ids = set()
+
+    for record in iter_records(lines):
+        level, function, record_user_ids, record_guild_ids = parse_record(record)
+
+        if level:
+            levels[level] = levels.get(level, 0) + 1
+            functions.add(function)
+
+        user_ids.update(record_user_ids)
+        guild_ids.update(record_guild_ids)
+
+    return {
+        "levels": levels,
+        "functions": sorted(functions),
+        "user_ids": sorted(user_ids),
+        "guild_ids": sorted(guild_ids),
+    }
+
+
+def get_index_path(archive_path: str) -> str:
+    """Return the path of the index of a day of archived logs."""
+
+    return f"{os.path.splitext(archive_path)[0]}{INDEX_SUFFIX}"
+
+
+def write_index(archive_path: str, index: dict) -> None:
+    """Write the index of a day of archived logs next to its archive."""
+
+    index_path = get_index_path(archive_path)
+
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as index_file:
+        json.dump(index, index_file, separators=(",", ":"))
+
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def read_index(archive_path: str) -> Optional[dict]:
+    """Return the index of a day of archived logs, or None if it has none yet."""
+
+    try:
+        with open(get_index_path(archive_path), encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    except FileNotFoundError:
+        return None
+
+
+def get_archives(
+    logs_dir: str, log_prefix: Optional[str] = None
+) -> List[Tuple[date, str]]:
+    """Return the date and path of every log archive, oldest first. A log_prefix of None includes every cluster."""
+
+    archives = []
+
+    for filename in os.listdir(logs_dir):
+        match = ARCHIVE_PATTERN.fullmatch(filename)
+
+        if match and (log_prefix is None or match["prefix"] == log_prefix):
+            try:
+                archive_date = datetime.strptime(match["date"], "%Y-%m-%d").date()
+
+            except ValueError:
+                continue
+
+            archives.append((archive_date, os.path.join(logs_dir, filename)))
+
+    return sorted(archives)
+
+
+def read_archive(archive_path: str) -> Iterator[str]:
+    """Yield the lines of a day of archived logs, decompressing them as they are read."""
+
+    with zipfile.ZipFile(archive_path) as archive:
+        for name in archive.namelist():
+            with archive.open(name) as log_file:
+                yield from io.TextIOWrapper(log_file, encoding="utf-8", errors="replace")
+
+
+def index_archives(logs_dir: str, log_prefix: Optional[str] = None) -> List[str]:
+    """Index the archives that have no index yet, e.g. ones rotated before indexing existed, and return their paths."""
+
+    indexed_archives = []
+
+    for _, archive_path in get_archives(logs_dir, log_prefix):
+        if not os.path.exists(get_index_path(archive_path)):
+            write_index(archive_path, build_index(read_archive(archive_path)))
+            indexed_archives.append(archive_path)
+
+    return indexed_archives
+
+
+def search_logs(
+    logs_dir: str,
+    query: LogQuery,
+    log_prefix: Optional[str] = None,
+    limit: int = 100,
+) -> SearchResult:
+    """Find the records matching a query, only decompressing the archives whose index may hold a match.
+
+    The current log files of today are always read, since they are only indexed once they rotate.
+    """
+
+    start_time = time.perf_counter()
+    records = []
+    log_files = []
+
+    for archive_date, archive_path in get_archives(logs_dir, log_prefix):
+        if query.matches_date(archive_date):
+            log_files.append((archive_path, read_index(archive_path)))
+
+    if query.matches_date(date.today()):
+        for filename in sorted(os.listdir(logs_dir)):
+            if filename.endswith("current.log") and (
+                log_prefix is None or filename == f"{log_prefix}current.log"
+            ):
+                log_files.append((os.path.join(logs_dir, filename), None))
+
+    scanned_files = 0
+
+    # Newest first, so a limited search returns the most recent records
+    for log_path, index in reversed(log_files):
+        if len(records) >= limit:
+            break
+
+        # Archives without an index are scanned rather than skipped
+        if index is not None and not query.matches_index(index):
+            continue
+
+        scanned_files += 1
+
+        if log_path.endswith(".zip"):
+            lines = read_archive(log_path)
+        else:
+            lines = open(log_path, encoding="utf-8", errors="replace")
+
+        try:
+            for record in iter_records(lines):
+                if query.matches_record(record):
+                    records.append((os.path.basename(log_path), record))
+
+                    if len(records) >= limit:
+                        break
+
+        finally:
+            lines.close()
+
+    return SearchResult(
+        records, len(log_files), scanned_files, time.perf_counter() - start_time
+    )
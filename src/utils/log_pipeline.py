@@ -0,0 +1,133 @@
+import atexit
+import logging
+import os
+import queue
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import List
+
+from utils.log_archive import build_index, get_archives, get_index_path, write_index
+
+logger = logging.getLogger("discord")
+
+
+def start_queue_logging(
+    target_logger: logging.Logger, *handlers: logging.Handler
+) -> QueueListener:
+    """Route the records of a logger through a queue to handlers running on a background thread.
+
+    A log call only puts the record on the queue, so it never waits on file or terminal I/O.
+    """
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    # Writes out the records still in the queue when the process exits
+    atexit.register(listener.stop)
+
+    target_logger.addHandler(QueueHandler(log_queue))
+
+    return listener
+
+
+class ArchivingFileHandler(TimedRotatingFileHandler):
+    """Class to rotate a log file at midnight, then zip and index the rotated day on a separate thread.
+
+    default name for a log file that is being rotated (namer receives this):
+    "current.log.2024-07-19"
+
+    custom name for log file that is being rotated (namer returns this):
+    "2024-07-18.zip"
+
+    clusters prefix both names with their cluster, so they never rotate onto each other's files:
+    "cluster-0-current.log.2024-07-19" -> "cluster-0-2024-07-18.zip"
+    """
+
+    def __init__(self, logs_dir: str, log_prefix: str = "") -> None:
+        super().__init__(
+            os.path.join(logs_dir, f"{log_prefix}current.log"),
+            when="midnight",
+            backupCount=365,
+        )
+        self.logs_dir = logs_dir
+        self.log_prefix = log_prefix
+        self.namer = self.get_archive_path
+        self.rotator = self.rotate
+
+        # One thread zips the rotated days in order, while the listener thread keeps writing the new day
+        self.archiver = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="log-archiver"
+        )
+
+        # Days that were rotated but not zipped yet when the bot last stopped
+        pending_pattern = re.compile(
+            rf"{re.escape(log_prefix)}\d{{4}}-\d{{2}}-\d{{2}}\.log"
+        )
+
+        for filename in sorted(os.listdir(logs_dir)):
+            if pending_pattern.fullmatch(filename):
+                self.archiver.submit(self.archive, os.path.join(logs_dir, filename))
+
+    def get_archive_path(self, name: str) -> str:
+        """Return the archive path of a rotated log file."""
+
+        if name.count(".") > 1:
+            return os.path.join(
+                self.logs_dir,
+                f"{self.log_prefix}{os.path.splitext(name)[1][1:]}.zip",
+            )
+
+        return name
+
+    def rotate(self, source: str, dest: str) -> None:
+        """Move the finished day aside and leave zipping it to the archiver thread."""
+
+        pending_path = f"{os.path.splitext(dest)[0]}.log"
+        os.replace(source, pending_path)
+
+        self.archiver.submit(self.archive, pending_path)
+
+    def getFilesToDelete(self) -> List[str]:
+        # The default only matches names that start like "current.log", which the archives don't
+        archives = [
+            archive_path
+            for _, archive_path in get_archives(self.logs_dir, self.log_prefix)
+        ]
+        expired_archives = archives[: max(len(archives) - self.backupCount, 0)]
+
+        return [
+            path
+            for archive_path in expired_archives
+            for path in (archive_path, get_index_path(archive_path))
+            if os.path.exists(path)
+        ]
+
+    def archive(self, pending_path: str) -> None:
+        """Zip and index a rotated day of logs and delete the uncompressed file."""
+
+        archive_path = f"{os.path.splitext(pending_path)[0]}.zip"
+        temporary_path = f"{archive_path}.tmp"
+
+        try:
+            with zipfile.ZipFile(temporary_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.write(pending_path, os.path.basename(self.baseFilename))
+
+            # A half-written zip never replaces a complete one
+            os.replace(temporary_path, archive_path)
+
+            # Indexed while the day is still uncompressed, so searches can skip the archive later on
+            with open(pending_path, encoding="utf-8", errors="replace") as log_file:
+                write_index(archive_path, build_index(log_file))
+
+            os.remove(pending_path)
+
+        except OSError as e:
+            logger.error("Error archiving log file %s: %s", pending_path, e)
+
+    def close(self) -> None:
+        # Finish zipping before the process exits
+        self.archiver.shutdown(wait=True)
+        super().close()
@@ -0,0 +1,232 @@
+from aiohttp import web
+from discord.ext import commands
+
+import functools
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Coroutine, Dict, List, Tuple
+
+logger = logging.getLogger("discord")
+
+# Upper bounds in seconds, the same kind of spread as the default Prometheus client buckets
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Metric:
+    """Class to hold the latency histogram, error count and in-flight gauge of one command or event."""
+
+    __slots__ = ("bucket_counts", "total_duration", "count", "errors", "in_flight")
+
+    def __init__(self) -> None:
+        # The last bucket counts everything above the largest bound
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_duration = 0.0
+        self.count = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    def observe(self, duration: float) -> None:
+        """Record one finished call."""
+
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.total_duration += duration
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Return the upper bound of the bucket holding the given quantile, or inf above the largest bound."""
+
+        target = q * self.count
+        cumulative_count = 0
+
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.bucket_counts):
+            cumulative_count += bucket_count
+
+            if cumulative_count >= target:
+                return bound
+
+        return float("inf")
+
+
+class Metrics:
+    """Class to collect latency, error & in-flight metrics of commands and event listeners."""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[Tuple[str, str], Metric] = {}
+
+    def get(self, kind: str, name: str) -> Metric:
+        """Return the metric of a command or event, creating it on first use."""
+
+        metric = self.metrics.get((kind, name))
+
+        if metric is None:
+            metric = self.metrics[(kind, name)] = Metric()
+
+        return metric
+
+    def wrap_listener(
+        self, event_name: str, func: Callable[..., Coroutine[Any, Any, Any]]
+    ) -> Callable[..., Coroutine[Any, Any, Any]]:
+        """Return a listener that records the metrics of the event around the original one."""
+
+        # Looked up once here, so a dispatch only costs two clock reads & a few additions
+        metric = self.get("event", event_name)
+
+        @functools.wraps(func)
+        async def listener(*args: Any, **kwargs: Any) -> Any:
+            metric.in_flight += 1
+            started_at = time.perf_counter()
+
+            try:
+                return await func(*args, **kwargs)
+
+            except Exception:
+                metric.errors += 1
+                raise
+
+            finally:
+                metric.observe(time.perf_counter() - started_at)
+                metric.in_flight -= 1
+
+        return listener
+
+    async def before_command(self, ctx: commands.Context) -> None:
+        """Bot wide before_invoke hook that starts timing a command."""
+
+        self.get("command", ctx.command.qualified_name).in_flight += 1
+        ctx.metrics_started_at = time.perf_counter()
+
+    async def after_command(self, ctx: commands.Context) -> None:
+        """Bot wide after_invoke hook that records a finished command."""
+
+        self.finish_command(ctx)
+
+    async def on_command_error(
+        self, ctx: commands.Context, error: commands.CommandError
+    ) -> None:
+        """Count a failed command.
+
+        Failed slash invocations of hybrid commands skip the after_invoke hook, so they are finished here as well.
+        """
+
+        if ctx.command:
+            self.get("command", ctx.command.qualified_name).errors += 1
+            self.finish_command(ctx)
+
+    def finish_command(self, ctx: commands.Context) -> None:
+        """Record the latency of a command and take it out of the in-flight gauge."""
+
+        started_at = getattr(ctx, "metrics_started_at", None)
+
+        # Commands that failed their checks never started, and finished commands aren't recorded twice
+        if started_at is None:
+            return
+
+        ctx.metrics_started_at = None
+
+        metric = self.get("command", ctx.command.qualified_name)
+        metric.observe(time.perf_counter() - started_at)
+        metric.in_flight -= 1
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+
+        lines = [
+            "# HELP funtimes_latency_seconds Time taken by commands & event listeners.",
+            "# TYPE funtimes_latency_seconds histogram",
+        ]
+
+        for (kind, name), metric in sorted(self.metrics.items()):
+            labels = f'kind="{kind}",name="{name}"'
+            cumulative_count = 0
+
+            for bound, bucket_count in zip(
+                (*LATENCY_BUCKETS, "+Inf"), metric.bucket_counts
+            ):
+                cumulative_count += bucket_count
+                lines.append(
+                    f'funtimes_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative_count}'
+                )
+
+            lines.append(
+                f"funtimes_latency_seconds_sum{{{labels}}} {metric.total_duration}"
+            )
+            lines.append(f"funtimes_latency_seconds_count{{{labels}}} {metric.count}")
+
+        lines.append(
+            "# HELP funtimes_errors_total Commands & event listeners that raised."
+        )
+        lines.append("# TYPE funtimes_errors_total counter")
+
+        for (kind, name), metric in sorted(self.metrics.items()):
+            lines.append(
+                f'funtimes_errors_total{{kind="{kind}",name="{name}"}} {metric.errors}'
+            )
+
+        lines.append(
+            "# HELP funtimes_in_flight Commands & event listeners running right now."
+        )
+        lines.append("# TYPE funtimes_in_flight gauge")
+
+        for (kind, name), metric in sorted(self.metrics.items()):
+            lines.append(
+                f'funtimes_in_flight{{kind="{kind}",name="{name}"}} {metric.in_flight}'
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self, kind: str) -> List[Tuple[str, Metric]]:
+        """Return the metrics of one kind, busiest first."""
+
+        return sorted(
+            (
+                (name, metric)
+                for (metric_kind, name), metric in self.metrics.items()
+                if metric_kind == kind
+            ),
+            key=lambda item: item[1].count,
+            reverse=True,
+        )
+
+
+class MetricsServer:
+    """Class to serve the metrics on a local HTTP /metrics endpoint for Prometheus to scrape."""
+
+    def __init__(self, metrics: Metrics, host: str, port: int) -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+        logger.info("Metrics are served on http://%s:%s/metrics", self.host, self.port)
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.metrics.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def close(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
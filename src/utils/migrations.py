@@ -0,0 +1,228 @@
+import logging
+import sqlite3
+import time
+from typing import Callable, List, NamedTuple, Tuple
+
+from utils.database import Database
+
+logger = logging.getLogger("discord")
+
+
+class Migration(NamedTuple):
+    """One step of the database schema. Versions are applied in ascending order and never change once released.
+
+    Steps that SQLite can't run inside a transaction, like VACUUM, set transactional to False.
+    """
+
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+    transactional: bool = True
+
+
+def create_level_table(db: sqlite3.Connection) -> None:
+    # Deployments from before migrations existed already have this table
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS level (
+            user_id BIGINT,
+            guild_id BIGINT,
+            experience INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            previous_message_timestamp REAL DEFAULT 0,
+            PRIMARY KEY (user_id, guild_id)
+        )
+        """
+    )
+
+
+def add_guild_experience_index(db: sqlite3.Connection) -> None:
+    # Replaces the ascending index that load_database used to create
+    db.execute("DROP INDEX IF EXISTS level_guild_experience")
+    db.execute(
+        "CREATE INDEX level_guild_experience_desc ON level (guild_id, experience DESC)"
+    )
+
+
+def convert_level_to_without_rowid(db: sqlite3.Connection) -> None:
+    # Rows are stored in primary key order, so member lookups skip the extra rowid b-tree
+    db.execute(
+        """
+        CREATE TABLE level_without_rowid (
+            user_id BIGINT,
+            guild_id BIGINT,
+            experience INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            previous_message_timestamp REAL DEFAULT 0,
+            PRIMARY KEY (user_id, guild_id)
+        ) WITHOUT ROWID
+        """
+    )
+    db.execute(
+        """
+        INSERT INTO level_without_rowid (user_id, guild_id, experience, level, previous_message_timestamp)
+        SELECT user_id, guild_id, experience, level, previous_message_timestamp FROM level
+        """
+    )
+    db.execute("DROP TABLE level")
+    db.execute("ALTER TABLE level_without_rowid RENAME TO level")
+    db.execute(
+        "CREATE INDEX level_guild_experience_desc ON level (guild_id, experience DESC)"
+    )
+
+
+def enable_incremental_vacuum(db: sqlite3.Connection) -> None:
+    # auto_vacuum can only be changed by rebuilding the file with VACUUM
+    if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.execute("VACUUM")
+
+
+def add_level_changelog(db: sqlite3.Connection) -> None:
+    # Holds the key of every level row changed since the last backup, for incremental backups
+    db.execute(
+        """
+        CREATE TABLE level_changelog (
+            user_id BIGINT,
+            guild_id BIGINT,
+            PRIMARY KEY (user_id, guild_id)
+        ) WITHOUT ROWID
+        """
+    )
+
+    # The upsert form, since the upserts writing the level table would override an OR IGNORE here
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        db.execute(
+            f"""
+            CREATE TRIGGER level_changelog_{event.lower()} AFTER {event} ON level
+            BEGIN
+                INSERT INTO level_changelog (user_id, guild_id) VALUES ({row}.user_id, {row}.guild_id)
+                ON CONFLICT DO NOTHING;
+            END
+            """
+        )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create level table", create_level_table),
+    Migration(2, "index level by guild & experience", add_guild_experience_index),
+    Migration(
+        3, "convert level to a WITHOUT ROWID table", convert_level_to_without_rowid
+    ),
+    Migration(
+        4,
+        "enable incremental auto vacuum",
+        enable_incremental_vacuum,
+        transactional=False,
+    ),
+    Migration(5, "add level changelog for incremental backups", add_level_changelog),
+]
+
+
+def is_applied(db: sqlite3.Connection, migration: Migration) -> bool:
+    return (
+        db.execute(
+            "SELECT 1 FROM schema_version WHERE version = ?", (migration.version,)
+        ).fetchone()
+        is not None
+    )
+
+
+def record_migration(
+    db: sqlite3.Connection, migration: Migration, duration: float
+) -> None:
+    db.execute(
+        "INSERT INTO schema_version (version, name, applied_at, duration) VALUES (?, ?, ?, ?)",
+        (migration.version, migration.name, time.time(), duration),
+    )
+
+
+def apply_migrations(db: sqlite3.Connection) -> List[Tuple[Migration, float]]:
+    """Apply every migration that hasn't been applied yet and return how long each one took."""
+
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at REAL NOT NULL,
+            duration REAL NOT NULL
+        )
+        """
+    )
+
+    applied_migrations = []
+
+    for migration in MIGRATIONS:
+        start_time = time.perf_counter()
+
+        if not migration.transactional:
+            if is_applied(db, migration):
+                continue
+
+            # These migrations have to be safe to run twice, as nothing stops another process from running it too
+            migration.apply(db)
+            duration = time.perf_counter() - start_time
+
+            with db:
+                if not is_applied(db, migration):
+                    record_migration(db, migration, duration)
+
+            applied_migrations.append((migration, duration))
+            continue
+
+        # Taking the write lock first means two processes starting at once can't apply the same migration twice
+        db.execute("BEGIN IMMEDIATE")
+
+        try:
+            if is_applied(db, migration):
+                db.rollback()
+                continue
+
+            migration.apply(db)
+
+            duration = time.perf_counter() - start_time
+            record_migration(db, migration, duration)
+            db.commit()
+
+        except sqlite3.Error:
+            db.rollback()
+            raise
+
+        applied_migrations.append((migration, duration))
+
+    return applied_migrations
+
+
+def get_schema_version(db: sqlite3.Connection) -> int:
+    """Return the version of the newest applied migration, or 0 for an unmigrated database."""
+
+    try:
+        return db.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+
+    except sqlite3.OperationalError:
+        return 0
+
+
+async def migrate(db: Database) -> int:
+    """Bring the database schema up to date on the writer thread and return the resulting schema version."""
+
+    applied_migrations = await db.run_write(apply_migrations)
+
+    for migration, duration in applied_migrations:
+        logger.info(
+            "Applied migration %s (%s) in %.3fs.",
+            migration.version,
+            migration.name,
+            duration,
+        )
+
+    schema_version = await db.run_write(get_schema_version)
+
+    logger.info(
+        "Database schema is at version %s (%s migrations applied now).",
+        schema_version,
+        len(applied_migrations),
+    )
+
+    return schema_version
@@ -0,0 +1,173 @@
+from easy_pil import Canvas, Editor, Font, Text
+from PIL import Image, ImageDraw
+
+import asyncio
+import functools
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Union
+
+from utils.errors import RankCardRendererBusy
+
+logger = logging.getLogger("discord")
+
+
+AVATAR_SIZE = 190
+AVATAR_POSITION = (50, 50)
+RING_POSITION = (42, 42)
+RING_SIZE = 206
+
+
+@functools.lru_cache(maxsize=None)
+def get_font() -> Font:
+    """Return the card font, loading it only once per process."""
+
+    return Font.poppins(size=30)
+
+
+@functools.lru_cache(maxsize=None)
+def get_template() -> Image.Image:
+    """Return the static background layers of every card, rendered only once per process."""
+
+    background = Editor(Canvas((900, 300), color="#23272A"))
+
+    background.rectangle((20, 20), 894, 260, "#2a2e35")
+    background.rectangle((260, 180), width=630, height=40, fill="#484b4e", radius=20)
+
+    return background.image
+
+
+@functools.lru_cache(maxsize=None)
+def get_ring_layer() -> Image.Image:
+    """Return the transparent ring that is drawn over the edge of the avatar."""
+
+    ring = Editor(Canvas((RING_SIZE, RING_SIZE), color=(0, 0, 0, 0)))
+    ring.ellipse(
+        (0, 0), width=RING_SIZE, height=RING_SIZE, outline="#43b581", stroke_width=10
+    )
+
+    return ring.image
+
+
+@functools.lru_cache(maxsize=None)
+def get_avatar_mask() -> Image.Image:
+    """Return an anti-aliased circle mask for the avatar."""
+
+    # Drawing the circle bigger and scaling it down smooths its edges
+    mask = Image.new("L", (AVATAR_SIZE * 4, AVATAR_SIZE * 4), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE * 4, AVATAR_SIZE * 4), fill=255)
+
+    return mask.resize((AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+
+
+def render_rank_card(
+    user_data: Dict[str, Union[str, int, float]], avatar_bytes: bytes
+) -> bytes:
+    """Draw a rank card and return it encoded as PNG bytes.
+
+    This only takes plain data so it can be ran inside of a worker process.
+    Only the parts of the card that differ between members are drawn here, on top of a copy of the template.
+    """
+
+    card = get_template().copy()
+
+    profile_image = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
+
+    if profile_image.size != (AVATAR_SIZE, AVATAR_SIZE):
+        profile_image = profile_image.resize((AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+
+    card.paste(profile_image, AVATAR_POSITION, get_avatar_mask())
+
+    ring_layer = get_ring_layer()
+    card.paste(ring_layer, RING_POSITION, ring_layer)
+
+    background = Editor(card)
+    poppins = get_font()
+
+    background.bar(
+        (260, 180),
+        max_width=630,
+        height=40,
+        percentage=user_data["percentage"],
+        fill="#00fa81",
+        radius=20,
+    )
+    background.text((270, 120), user_data["name"], font=poppins, color="#00fa81")
+    background.text(
+        (870, 125),
+        f"{user_data['xp']} / {user_data['next_level_xp']}",
+        font=poppins,
+        color="#00fa81",
+        align="right",
+    )
+
+    rank_level_texts = [
+        Text("Rank ", color="#00fa81", font=poppins),
+        Text(f"{user_data['rank']}", color="#1EAAFF", font=poppins),
+        Text("   Level ", color="#00fa81", font=poppins),
+        Text(f"{user_data['level']}", color="#1EAAFF", font=poppins),
+    ]
+
+    background.multi_text((850, 50), texts=rank_level_texts, align="right")
+
+    # The card is fully opaque, so dropping the alpha channel and compressing less makes encoding much cheaper
+    buffer = io.BytesIO()
+    background.image.convert("RGB").save(buffer, format="PNG", compress_level=3)
+
+    return buffer.getvalue()
+
+
+class RankCardRenderer:
+    """Class to render rank cards inside of a pool of worker processes.
+
+    At most `concurrency` cards are rendered at once and at most `max_queued` more may wait for a worker.
+    Any requests past that are rejected straight away with RankCardRendererBusy.
+    """
+
+    def __init__(self, concurrency: int = 2, max_queued: int = 16) -> None:
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+        # Spawned workers don't inherit the bot's threads, sockets or db connections
+        self.pool = ProcessPoolExecutor(
+            max_workers=concurrency, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def is_full(self) -> bool:
+        """Check if the render queue has no room for another request."""
+
+        return self.in_flight >= self.concurrency + self.max_queued
+
+    async def render(
+        self, user_data: Dict[str, Union[str, int, float]], avatar_bytes: bytes
+    ) -> bytes:
+        """Render a rank card in a worker process and return its PNG bytes."""
+
+        if self.is_full():
+            raise RankCardRendererBusy(
+                f"{self.in_flight} rank cards are already being rendered or queued."
+            )
+
+        self.in_flight += 1
+
+        try:
+            async with self.semaphore:
+                loop = asyncio.get_running_loop()
+
+                return await loop.run_in_executor(
+                    self.pool, render_rank_card, user_data, avatar_bytes
+                )
+
+        finally:
+            self.in_flight -= 1
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+        logger.info("Rank card renderer has been shut down.")
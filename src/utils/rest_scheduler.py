@@ -0,0 +1,222 @@
+from discord.ext import commands
+
+import asyncio
+import enum
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+from utils.errors import RestSchedulerBacklogFull
+
+logger = logging.getLogger("discord")
+
+
+class Priority(enum.IntEnum):
+    """Priority classes of outbound REST calls. Lower values are sent first."""
+
+    INTERACTIVE = 0
+    ROLES = 1
+    ANNOUNCEMENTS = 2
+
+
+class RestJob:
+    """A single queued REST call."""
+
+    __slots__ = ("priority", "bucket", "factory", "future", "enqueued_at")
+
+    def __init__(
+        self,
+        priority: Priority,
+        bucket: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        future: asyncio.Future,
+    ) -> None:
+        self.priority = priority
+        self.bucket = bucket
+        self.factory = factory
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class RestScheduler:
+    """Class to order bot-initiated REST calls by priority.
+
+    Calls are grouped into buckets that mirror Discord's rate limit routes (e.g. ("channel", id) or ("guild", id)),
+    and only one call per bucket runs at a time so a busy bucket never holds up the others.
+    Some of the concurrency is reserved for interactive replies, so they are sent straight away
+    even while role changes and announcements are backed up.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        reserved_interactive_slots: int = 1,
+        max_backlog: int = 1000,
+    ) -> None:
+        # Without a slot left over for them, background calls would never be sent
+        if max_concurrency <= reserved_interactive_slots:
+            raise ValueError(
+                f"max_concurrency ({max_concurrency}) must be greater than reserved_interactive_slots ({reserved_interactive_slots})."
+            )
+
+        self.max_concurrency = max_concurrency
+        self.max_background_concurrency = max_concurrency - reserved_interactive_slots
+        self.max_backlog = max_backlog
+
+        self.ready_jobs: List[Tuple[int, int, RestJob]] = []
+        self.blocked_jobs: Dict[Hashable, List[Tuple[int, int, RestJob]]] = {}
+        self.busy_buckets: Set[Hashable] = set()
+        self.sequence = itertools.count()
+        # Keeps a reference to every running call, so none of them are garbage collected mid-flight
+        self.tasks: Set[asyncio.Task] = set()
+
+        self.backlog = 0
+        self.running = 0
+        self.running_background = 0
+
+        self.completed = {priority: 0 for priority in Priority}
+        self.rejected = {priority: 0 for priority in Priority}
+        self.total_wait = {priority: 0.0 for priority in Priority}
+        self.max_wait = {priority: 0.0 for priority in Priority}
+
+    async def submit(
+        self,
+        priority: Priority,
+        bucket: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Queue a REST call and return its result once it has been sent.
+
+        Background calls raise RestSchedulerBacklogFull if too many calls are already waiting.
+        Interactive calls are never rejected.
+        """
+
+        if priority != Priority.INTERACTIVE and self.backlog >= self.max_backlog:
+            self.rejected[priority] += 1
+            raise RestSchedulerBacklogFull(
+                f"{self.backlog} REST calls are already waiting to be sent."
+            )
+
+        job = RestJob(
+            priority, bucket, factory, asyncio.get_running_loop().create_future()
+        )
+
+        heapq.heappush(self.ready_jobs, (priority, next(self.sequence), job))
+        self.backlog += 1
+        self.dispatch()
+
+        return await job.future
+
+    async def reply(self, ctx: commands.Context, **kwargs: Any) -> Any:
+        """Reply to a command as an interactive call."""
+
+        # Its own bucket, so replies never queue behind announcements in the same channel
+        return await self.submit(
+            Priority.INTERACTIVE,
+            ("reply", ctx.channel.id),
+            lambda: ctx.reply(**kwargs),
+        )
+
+    def dispatch(self) -> None:
+        """Start as many queued calls as the concurrency limits allow."""
+
+        while self.ready_jobs and self.running < self.max_concurrency:
+            priority, sequence, job = self.ready_jobs[0]
+
+            # The heap is ordered by priority, so if the top job is background there are no interactive jobs waiting
+            if (
+                priority != Priority.INTERACTIVE
+                and self.running_background >= self.max_background_concurrency
+            ):
+                break
+
+            heapq.heappop(self.ready_jobs)
+
+            if job.bucket in self.busy_buckets:
+                heapq.heappush(
+                    self.blocked_jobs.setdefault(job.bucket, []),
+                    (priority, sequence, job),
+                )
+                continue
+
+            self.start(job)
+
+    def start(self, job: RestJob) -> None:
+        """Run a job and record how long it waited in the queue."""
+
+        self.backlog -= 1
+
+        # Nobody is waiting for the result anymore, so the call doesn't need to be made
+        if job.future.cancelled():
+            self.release_next(job.bucket)
+            return
+
+        wait = time.perf_counter() - job.enqueued_at
+        self.total_wait[job.priority] += wait
+        self.max_wait[job.priority] = max(self.max_wait[job.priority], wait)
+
+        self.busy_buckets.add(job.bucket)
+        self.running += 1
+
+        if job.priority != Priority.INTERACTIVE:
+            self.running_background += 1
+
+        task = asyncio.create_task(self.run(job))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run(self, job: RestJob) -> None:
+        """Make the REST call of a job and hand its result back to the submitter."""
+
+        try:
+            result = await job.factory()
+
+            if not job.future.done():
+                job.future.set_result(result)
+
+        except Exception as error:
+            if not job.future.done():
+                job.future.set_exception(error)
+
+        finally:
+            # E.g. cancelled while the bot shuts down, so the submitter doesn't wait forever
+            if not job.future.done():
+                job.future.cancel()
+
+            self.completed[job.priority] += 1
+            self.running -= 1
+
+            if job.priority != Priority.INTERACTIVE:
+                self.running_background -= 1
+
+            self.busy_buckets.discard(job.bucket)
+            self.release_next(job.bucket)
+            self.dispatch()
+
+    def release_next(self, bucket: Hashable) -> None:
+        """Let the next call of a bucket compete with everything else again."""
+
+        blocked_bucket_jobs = self.blocked_jobs.get(bucket)
+
+        if blocked_bucket_jobs:
+            heapq.heappush(self.ready_jobs, heapq.heappop(blocked_bucket_jobs))
+
+            if not blocked_bucket_jobs:
+                del self.blocked_jobs[bucket]
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return the completed & rejected counts and queue wait times of every priority class."""
+
+        return {
+            priority.name.lower(): {
+                "completed": self.completed[priority],
+                "rejected": self.rejected[priority],
+                "average_wait": self.total_wait[priority] / self.completed[priority]
+                if self.completed[priority]
+                else 0.0,
+                "max_wait": self.max_wait[priority],
+            }
+            for priority in Priority
+        }
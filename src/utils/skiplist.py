@@ -0,0 +1,173 @@
+import random
+import sys
+from typing import Iterator, List, Optional
+
+
+class SkipListNode:
+    """A single node of an IndexableSkipList.
+
+    width[level] is the number of level-0 steps it takes to get from this node to next[level].
+    """
+
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Optional[int], height: int) -> None:
+        self.key = key
+        self.next: List[Optional["SkipListNode"]] = [None] * height
+        self.width: List[int] = [1] * height
+
+
+# Nodes only differ in the length of their link lists, so their size follows from how many links there are
+NODE_BYTES = sys.getsizeof(SkipListNode(None, 0)) + 2 * sys.getsizeof([])
+LINK_BYTES = sys.getsizeof([None]) - sys.getsizeof([])
+
+
+class IndexableSkipList:
+    """An order-statistic skip list of unique int keys kept in ascending order.
+
+    Inserting, removing, finding the key at a position and finding the position of a key
+    all run in expected O(log n) time. The number of links & the size of the keys are counted as
+    nodes come and go, so the memory footprint can be estimated without walking the list.
+    """
+
+    MAX_HEIGHT = 24
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.link_count = 0
+        self.key_bytes = 0
+        self.head = SkipListNode(None, self.MAX_HEIGHT)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        node = self.head.next[0]
+
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def random_height(self) -> int:
+        """Return a random node height where each extra level has a 50% chance of being added."""
+
+        height = 1
+
+        while height < self.MAX_HEIGHT and random.getrandbits(1):
+            height += 1
+
+        return height
+
+    def find_chain(
+        self, key: int, steps_at_level: Optional[List[int]] = None
+    ) -> List[SkipListNode]:
+        """Return the last node before key on every level, counting the steps taken on each level if asked."""
+
+        chain = [self.head] * self.MAX_HEIGHT
+        node = self.head
+
+        for level in reversed(range(self.MAX_HEIGHT)):
+            next_node = node.next[level]
+
+            while next_node is not None and next_node.key < key:
+                if steps_at_level is not None:
+                    steps_at_level[level] += node.width[level]
+
+                node = next_node
+                next_node = node.next[level]
+
+            chain[level] = node
+
+        return chain
+
+    def insert(self, key: int) -> None:
+        """Insert a key that isn't already in the list."""
+
+        steps_at_level = [0] * self.MAX_HEIGHT
+        chain = self.find_chain(key, steps_at_level)
+
+        height = self.random_height()
+        new_node = SkipListNode(key, height)
+        steps = 0
+
+        for level in range(height):
+            prev_node = chain[level]
+
+            new_node.next[level] = prev_node.next[level]
+            prev_node.next[level] = new_node
+
+            new_node.width[level] = prev_node.width[level] - steps
+            prev_node.width[level] = steps + 1
+
+            steps += steps_at_level[level]
+
+        # Every link that jumps over the new node is now one step longer
+        for level in range(height, self.MAX_HEIGHT):
+            chain[level].width[level] += 1
+
+        self.size += 1
+        self.link_count += height
+        self.key_bytes += sys.getsizeof(key)
+
+    def remove(self, key: int) -> None:
+        """Remove a key from the list, raising KeyError if it isn't there."""
+
+        chain = self.find_chain(key)
+        node = chain[0].next[0]
+
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for level in range(len(node.next)):
+            prev_node = chain[level]
+
+            prev_node.width[level] += node.width[level] - 1
+            prev_node.next[level] = node.next[level]
+
+        for level in range(len(node.next), self.MAX_HEIGHT):
+            chain[level].width[level] -= 1
+
+        self.size -= 1
+        self.link_count -= len(node.next)
+        self.key_bytes -= sys.getsizeof(node.key)
+
+    def __getitem__(self, index: int) -> int:
+        """Return the key at a 0-based position."""
+
+        if not 0 <= index < self.size:
+            raise IndexError("skip list index out of range")
+
+        node = self.head
+        remaining_steps = index + 1
+
+        for level in reversed(range(self.MAX_HEIGHT)):
+            while (
+                node.next[level] is not None and node.width[level] <= remaining_steps
+            ):
+                remaining_steps -= node.width[level]
+                node = node.next[level]
+
+        return node.key
+
+    def index(self, key: int) -> int:
+        """Return the 0-based position of a key, raising KeyError if it isn't there."""
+
+        steps_at_level = [0] * self.MAX_HEIGHT
+        chain = self.find_chain(key, steps_at_level)
+        node = chain[0].next[0]
+
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        return sum(steps_at_level)
+
+    def memory_footprint(self) -> int:
+        """Return the approximate amount of bytes used by the list and its keys in O(1)."""
+
+        # The head node is counted as well, with a link on every level
+        return (
+            sys.getsizeof(self)
+            + (self.size + 1) * NODE_BYTES
+            + 2 * (self.link_count + self.MAX_HEIGHT) * LINK_BYTES
+            + self.key_bytes
+        )
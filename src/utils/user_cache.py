@@ -0,0 +1,125 @@
+import discord
+from discord.ext import commands
+
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+class UserCache:
+    """Class to resolve users with as few REST calls as possible.
+
+    The gateway cache is checked first, fetched profiles are kept for a TTL,
+    and concurrent fetches for the same user ID are collapsed into a single HTTP call.
+    """
+
+    def __init__(
+        self, bot: commands.Bot, ttl: float = 600, max_profiles: int = 5000
+    ) -> None:
+        self.bot = bot
+        self.ttl = ttl
+        self.max_profiles = max_profiles
+
+        # Stored in {user_id: (expiry, user)} format
+        self.profiles: Dict[int, Tuple[float, discord.User]] = {}
+        self.pending_fetches: Dict[int, asyncio.Future] = {}
+
+        self.gateway_hits = 0
+        self.profile_hits = 0
+        self.collapsed_fetches = 0
+        self.misses = 0
+
+    async def get_user(
+        self, user_id: int, guild: Optional[discord.Guild] = None
+    ) -> Union[discord.Member, discord.User]:
+        """Return a user from the gateway cache, falling back to a fetched profile."""
+
+        user = (guild.get_member(user_id) if guild else None) or self.bot.get_user(
+            user_id
+        )
+
+        if user:
+            self.gateway_hits += 1
+            return user
+
+        return await self.fetch_user(user_id)
+
+    async def get_users(
+        self, user_ids: Iterable[int], guild: Optional[discord.Guild] = None
+    ) -> List[Union[discord.Member, discord.User]]:
+        """Return multiple users in order, fetching any uncached ones concurrently."""
+
+        return await asyncio.gather(
+            *(self.get_user(user_id, guild) for user_id in user_ids)
+        )
+
+    async def fetch_user(self, user_id: int) -> discord.User:
+        """Return the full profile of a user, which unlike gateway users includes their banner."""
+
+        cached_profile = self.profiles.get(user_id)
+
+        if cached_profile and cached_profile[0] > time.monotonic():
+            self.profile_hits += 1
+            return cached_profile[1]
+
+        # Wait on the fetch that is already in flight instead of making another one
+        pending_fetch = self.pending_fetches.get(user_id)
+
+        if pending_fetch:
+            self.collapsed_fetches += 1
+            return await asyncio.shield(pending_fetch)
+
+        self.misses += 1
+
+        pending_fetch = asyncio.get_running_loop().create_future()
+        self.pending_fetches[user_id] = pending_fetch
+
+        try:
+            user = await self.bot.fetch_user(user_id)
+
+        except Exception as error:
+            pending_fetch.set_exception(error)
+
+            # Mark the exception as retrieved in case nobody else was waiting on it
+            pending_fetch.exception()
+            raise
+
+        finally:
+            del self.pending_fetches[user_id]
+
+            # A cancelled fetch skips the except above, so release the waiting followers too
+            if not pending_fetch.done():
+                pending_fetch.cancel()
+
+        self.store_profile(user)
+        pending_fetch.set_result(user)
+
+        return user
+
+    def store_profile(self, user: discord.User) -> None:
+        """Cache a fetched profile, making room for it if the cache is full."""
+
+        if len(self.profiles) >= self.max_profiles:
+            current_time = time.monotonic()
+
+            self.profiles = {
+                user_id: cached_profile
+                for user_id, cached_profile in self.profiles.items()
+                if cached_profile[0] > current_time
+            }
+
+            # Drop the oldest profiles if nothing had expired yet
+            while len(self.profiles) >= self.max_profiles:
+                del self.profiles[next(iter(self.profiles))]
+
+        self.profiles[user.id] = (time.monotonic() + self.ttl, user)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit & miss counters of the cache."""
+
+        return {
+            "gateway_hits": self.gateway_hits,
+            "profile_hits": self.profile_hits,
+            "collapsed_fetches": self.collapsed_fetches,
+            "misses": self.misses,
+        }
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Set, Union
+
+logger = logging.getLogger("discord")
+
+
+class XPEvent(NamedTuple):
+    """The only parts of a message that XP processing needs."""
+
+    guild_id: int
+    user_id: int
+    channel_id: int
+    timestamp: float
+
+
+class XPIngestQueue:
+    """Class to move XP processing out of the gateway dispatch path.
+
+    The listener only submits tiny XPEvents onto a bounded queue and never waits.
+    A pool of worker tasks processes them in the background.
+
+    Events from a member that already has an event queued or being processed are merged into it,
+    since the XP cooldown would make the extra event worthless anyway.
+    When the queue is full, the overflow policy decides whether the new event ("drop_newest")
+    or the oldest queued event ("drop_oldest") is dropped.
+    """
+
+    OVERFLOW_POLICIES = {"drop_newest", "drop_oldest"}
+
+    def __init__(
+        self,
+        handler: Callable[[XPEvent], Awaitable[None]],
+        worker_count: int = 4,
+        max_size: int = 10000,
+        overflow_policy: str = "drop_newest",
+    ) -> None:
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.handler = handler
+        self.worker_count = worker_count
+        self.overflow_policy = overflow_policy
+
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        self.pending_keys: Set[int] = set()
+        self.workers: List[asyncio.Task] = []
+
+        self.submitted = 0
+        self.merged = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    @staticmethod
+    def make_key(event: XPEvent) -> int:
+        """Pack the guild and user ID of an event into one int."""
+
+        return (event.guild_id << 64) | event.user_id
+
+    def start(self) -> None:
+        """Start the worker tasks."""
+
+        self.workers = [
+            asyncio.create_task(self.worker(), name=f"xp-ingest-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Give the workers a chance to drain the queue and then cancel them."""
+
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+
+        except asyncio.TimeoutError:
+            logger.warning(
+                "XP ingest queue was stopped with %s events left unprocessed.",
+                self.queue.qsize(),
+            )
+
+        for worker in self.workers:
+            worker.cancel()
+
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, event: XPEvent) -> bool:
+        """Queue an event without ever waiting. Returns False if the event was dropped."""
+
+        key = self.make_key(event)
+
+        if key in self.pending_keys:
+            self.merged += 1
+            return True
+
+        if self.queue.full():
+            if self.overflow_policy == "drop_newest":
+                self.dropped += 1
+                return False
+
+            # Make room by dropping the event that has already waited the longest
+            oldest_event = self.queue.get_nowait()
+            self.queue.task_done()
+            self.pending_keys.discard(self.make_key(oldest_event))
+            self.dropped += 1
+
+        self.queue.put_nowait(event)
+        self.pending_keys.add(key)
+        self.submitted += 1
+
+        return True
+
+    async def worker(self) -> None:
+        """Process queued events until cancelled."""
+
+        while True:
+            event = await self.queue.get()
+
+            lag = time.time() - event.timestamp
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+
+            try:
+                await self.handler(event)
+                self.processed += 1
+
+            except Exception as error:
+                self.failed += 1
+                logger.error(
+                    "Error processing XP for UserID: %s, GuildID: %s",
+                    event.user_id,
+                    event.guild_id,
+                    exc_info=error,
+                )
+
+            finally:
+                # The key stays pending while the event is processed so one member is never processed twice at once
+                self.pending_keys.discard(self.make_key(event))
+                self.queue.task_done()
+
+    def metrics(self) -> Dict[str, Union[int, float]]:
+        """Return the queue depth, throughput counters and processing lag."""
+
+        return {
+            "depth": self.queue.qsize(),
+            "submitted": self.submitted,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failed": self.failed,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "average_lag": self.total_lag / (self.processed + self.failed)
+            if self.processed + self.failed
+            else 0.0,
+        }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The bot imports its modules relative to src, the same as when it is run from there
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,18 @@
+import discord
+from discord.ext import commands
+
+import asyncio
+import time
+
+from cogs.commands.admin.info_bot import InfoBot
+
+
+def test_cluster_info_on_non_sharded_bot() -> None:
+    bot = commands.Bot(command_prefix="$", intents=discord.Intents.none())
+    bot.start_time = time.time()
+    bot.cluster_ipc = None
+
+    cluster_info = asyncio.run(InfoBot(bot).cluster_info())
+
+    assert cluster_info["shard_ids"] == [0]
+    assert cluster_info["guilds"] == 0
@@ -0,0 +1,42 @@
+import asyncio
+
+from utils.rest_scheduler import Priority, RestScheduler
+
+
+def test_cancelled_blocked_job_releases_the_next_job_of_its_bucket() -> None:
+    async def main() -> None:
+        scheduler = RestScheduler()
+        first_call_done = asyncio.Event()
+
+        async def first_call() -> str:
+            await first_call_done.wait()
+            return "first"
+
+        async def call(result: str) -> str:
+            return result
+
+        first = asyncio.create_task(
+            scheduler.submit(Priority.ROLES, "bucket", first_call)
+        )
+        second = asyncio.create_task(
+            scheduler.submit(Priority.ROLES, "bucket", lambda: call("second"))
+        )
+        third = asyncio.create_task(
+            scheduler.submit(Priority.ROLES, "bucket", lambda: call("third"))
+        )
+        await asyncio.sleep(0)
+
+        # The second job is blocked behind the first one when its submitter gives up
+        assert len(scheduler.blocked_jobs["bucket"]) == 2
+        second.cancel()
+        await asyncio.sleep(0)
+
+        first_call_done.set()
+
+        assert await asyncio.wait_for(first, 1) == "first"
+        assert await asyncio.wait_for(third, 1) == "third"
+        assert second.cancelled()
+        assert not scheduler.blocked_jobs
+        assert scheduler.backlog == 0
+
+    asyncio.run(main())
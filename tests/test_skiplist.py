@@ -0,0 +1,33 @@
+import random
+import sys
+
+from utils.skiplist import IndexableSkipList, SkipListNode
+
+
+def walk_footprint(skip_list: IndexableSkipList) -> int:
+    def node_footprint(node: SkipListNode) -> int:
+        return (
+            sys.getsizeof(node) + sys.getsizeof(node.next) + sys.getsizeof(node.width)
+        )
+
+    total_bytes = sys.getsizeof(skip_list) + node_footprint(skip_list.head)
+    node = skip_list.head.next[0]
+
+    while node is not None:
+        total_bytes += node_footprint(node) + sys.getsizeof(node.key)
+        node = node.next[0]
+
+    return total_bytes
+
+
+def test_memory_footprint_matches_a_full_walk() -> None:
+    skip_list = IndexableSkipList()
+    keys = list({random.getrandbits(80) - (1 << 79) for _ in range(2000)})
+
+    for key in keys:
+        skip_list.insert(key)
+
+    for key in keys[:500]:
+        skip_list.remove(key)
+
+    assert skip_list.memory_footprint() == walk_footprint(skip_list)